@@ -0,0 +1,98 @@
+import logging
+import time
+
+import httpx
+
+import http_pool
+import metrics
+from tracing import CORRELATION_HEADER
+
+logger = logging.getLogger(__name__)
+
+BACKEND_LATENCY = metrics.Histogram(
+    'backend_request_duration_seconds', "Backend API so'rovlari davomiyligi", ['endpoint'])
+BACKEND_RESPONSES = metrics.Counter(
+    'backend_responses', "Backend javoblari (status kodi yoki xatolik turi bo'yicha)", ['endpoint', 'status'])
+
+
+class BackendClient:
+    """Backend auth API uchun asinxron klient (event loop'ni bloklamaydi)"""
+
+    def __init__(self, url_builder):
+        # url_builder - endpoint nomidan to'liq URL yasaydigan funksiya (get_backend_url).
+        # Timeout umumiy pool klientida (HTTP_TIMEOUT) - so'rov bo'yicha berilmaydi
+        self._url_builder = url_builder
+
+    async def _post(self, endpoint: str, payload: dict, log_payload: dict = None,
+                    correlation_id: str = None) -> httpx.Response:
+        """Backend'ga POST so'rov yuborish (correlation_id - X-Correlation-ID sarlavhasi)"""
+        url = self._url_builder(endpoint)
+        if not url:
+            raise RuntimeError("BACKEND_URL topilmadi! .env faylni tekshiring!")
+
+        logger.debug("➡️ Backend so'rov: %s payload=%s", url, log_payload if log_payload is not None else payload)
+
+        # Umumiy pool - ulanishlar keep-alive bilan qayta ishlatiladi
+        headers = {'Content-Type': 'application/json'}
+        if correlation_id:
+            headers[CORRELATION_HEADER] = correlation_id
+
+        client = http_pool.get_async_client('backend')
+        started = time.perf_counter()
+        try:
+            response = await client.post(
+                url,
+                json=payload,
+                headers=headers,
+            )
+        except httpx.HTTPError as e:
+            BACKEND_RESPONSES.inc(endpoint=endpoint, status=type(e).__name__)
+            raise
+        finally:
+            BACKEND_LATENCY.observe(time.perf_counter() - started, endpoint=endpoint)
+        BACKEND_RESPONSES.inc(endpoint=endpoint, status=response.status_code)
+
+        logger.debug("⬅️ Backend javob: %s %s body=%.500s", endpoint, response.status_code, response.text)
+        return response
+
+    async def send_code(self, phone: str, correlation_id: str = None) -> httpx.Response:
+        """POST /api/auth/send-code - login uchun kod so'rash"""
+        return await self._post("auth/send-code", {'phoneNumber': phone}, correlation_id=correlation_id)
+
+    async def send_register_code(self, phone: str, correlation_id: str = None) -> httpx.Response:
+        """POST /api/auth/send-register-code - ro'yxatdan o'tish uchun kod so'rash"""
+        return await self._post("auth/send-register-code", {'phoneNumber': phone, 'source': 'register'},
+                                correlation_id=correlation_id)
+
+    async def forgot_password(self, phone: str, correlation_id: str = None) -> httpx.Response:
+        """POST /api/auth/forgot-password - parolni tiklash uchun kod so'rash"""
+        return await self._post("auth/forgot-password", {'phoneNumber': phone, 'source': 'bot'},
+                                correlation_id=correlation_id)
+
+    async def login(self, phone: str, password: str) -> httpx.Response:
+        """POST /api/auth/login - parol bilan kirish"""
+        return await self._post(
+            "auth/login",
+            {'phoneNumber': phone, 'password': password},
+            log_payload={'phoneNumber': phone, 'password': '***'},
+        )
+
+    async def register(self, full_name: str, phone: str, password: str, role: str, code: str) -> httpx.Response:
+        """POST /api/auth/register - ro'yxatdan o'tish"""
+        return await self._post(
+            "auth/register",
+            {'fullName': full_name, 'phoneNumber': phone, 'password': password, 'role': role, 'code': code},
+            log_payload={'fullName': full_name, 'phoneNumber': phone, 'role': role, 'code': code},
+        )
+
+    async def verify_code(self, phone: str, code: str) -> httpx.Response:
+        """POST /api/auth/verify-code - kodni tekshirish"""
+        return await self._post("auth/verify-code", {'phoneNumber': phone, 'code': code})
+
+    async def reset_password(self, reset_token: str, new_password: str) -> httpx.Response:
+        """POST /api/auth/reset-password - yangi parol o'rnatish"""
+        return await self._post(
+            "auth/reset-password",
+            {'resetToken': reset_token, 'newPassword': new_password},
+            log_payload={'resetToken': '***', 'newPassword': '***'},
+        )
@@ -0,0 +1,92 @@
+"""
+bot.py ni import qilish vaqti (cold start)
+
+Har bir o'lchov yangi Python process'da bajariladi:
+  - "import bot" - faqat import (yon ta'sirsiz: .env, logging, DB ochilmaydi)
+  - "import bot + create_app()" - oldingi import bilan teng ish
+    (sozlamalar, migratsiyalar, DB, Application va webhook server)
+Oxirida `python -X importtime` bo'yicha eng qimmat modullar chiqariladi.
+
+Ishga tushirish:
+    python benchmarks/bench_import.py [--runs 10] [--top 15]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_ONLY = "import bot"
+IMPORT_AND_CREATE = (
+    "import bot\n"
+    "from config import Settings\n"
+    "bot.create_app(Settings({'BOT_TOKEN': '123:bench', 'DB_FILE': 'bench_users.db'}))\n"
+)
+# Import yon ta'sirsiz ekanini tekshirish
+SIDE_EFFECTS_CHECK = (
+    "import logging, os\n"
+    "import bot\n"
+    "assert not os.path.exists('users.db'), 'import users.db ni ochdi'\n"
+    "assert not logging.getLogger().handlers, 'import logging ni sozladi'\n"
+    "assert bot.settings is None and bot.user_repo is None\n"
+)
+
+
+def run(code, cwd, *flags):
+    env = {**os.environ, 'PYTHONPATH': ROOT, 'PYTHONDONTWRITEBYTECODE': '1'}
+    return subprocess.run(
+        [sys.executable, *flags, '-c', code],
+        cwd=cwd, env=env, capture_output=True, text=True, check=True
+    )
+
+
+def measure(label, code, runs):
+    """code ni runs marta yangi process'da bajarib, import vaqtini (ms) olish"""
+    timings = []
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as tmp:
+            timed = f"import time\n_t = time.perf_counter()\n{code}\nprint((time.perf_counter() - _t) * 1000)\n"
+            timings.append(float(run(timed, tmp).stdout.strip().splitlines()[-1]))
+    median = statistics.median(timings)
+    print(f"{label:<30} {median:>8.1f} ms  (min {min(timings):.1f}, max {max(timings):.1f})")
+    return median
+
+
+def importtime_top(top):
+    """-X importtime natijasidan eng ko'p cumulative vaqt olgan modullar"""
+    with tempfile.TemporaryDirectory() as tmp:
+        stderr = run(IMPORT_ONLY, tmp, '-X', 'importtime').stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len('import time:'):].split('|'))
+        rows.append((int(cumulative_us), int(self_us), name))
+    print(f"\n-X importtime (import bot), cumulative bo'yicha top {top}:")
+    for cumulative_us, self_us, name in sorted(rows, reverse=True)[:top]:
+        print(f"  {cumulative_us / 1000:>8.1f} ms  (self {self_us / 1000:>6.1f} ms)  {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        run(SIDE_EFFECTS_CHECK, tmp)
+    print("✅ import bot - yon ta'sirsiz (users.db ochilmadi, logging sozlanmadi)\n")
+
+    after = measure("import bot", IMPORT_ONLY, args.runs)
+    before = measure("import bot + create_app()", IMPORT_AND_CREATE, args.runs)
+    print(f"{'create_app() narxi':<30} {before - after:>8.1f} ms")
+
+    importtime_top(args.top)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+users jadvali uchun mikrobenchmark: get_user sekundiga nechta marta
+
+Eski usul (har chaqiriqda sqlite3.connect/close) bilan UserStorage
+(bitta uzoq yashovchi ulanish, WAL, prepared statement) solishtiriladi.
+
+Ishga tushirish:
+    python benchmarks/bench_storage.py [--users 10000] [--lookups 20000]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import UserStorage  # noqa: E402
+
+
+def populate(storage, count):
+    """Test foydalanuvchilarini yozish"""
+    for user_id in range(1, count + 1):
+        storage.save_user({
+            'user_id': user_id,
+            'phone': f"+99890{user_id:07d}",
+            'full_name': f"User {user_id}",
+            'role': 'user',
+            'balans': '0',
+            'access_token': 'a' * 64,
+            'refresh_token': 'r' * 64,
+            'lang': 'uz',
+            'logged_in': True
+        })
+
+
+def get_user_connect_per_call(db_file, user_id):
+    """Oldingi get_user - har safar yangi ulanish"""
+    conn = sqlite3.connect(db_file)
+    cursor = conn.cursor()
+    cursor.execute('SELECT * FROM users WHERE user_id = ?', (user_id,))
+    user = cursor.fetchone()
+    conn.close()
+    return user
+
+
+def measure(label, func, ids):
+    start = time.perf_counter()
+    for user_id in ids:
+        func(user_id)
+    elapsed = time.perf_counter() - start
+    rate = len(ids) / elapsed
+    print(f"{label:<28} {rate:>12,.0f} lookups/s  ({elapsed * 1000:.1f} ms)")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--lookups', type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, 'bench_users.db')
+        storage = UserStorage(db_file)
+        storage.init_db()
+        populate(storage, args.users)
+
+        ids = [random.randint(1, args.users) for _ in range(args.lookups)]
+
+        before = measure("connect-per-call (eski)", lambda uid: get_user_connect_per_call(db_file, uid), ids)
+        after = measure("UserStorage (yangi)", storage.get_user, ids)
+        print(f"{'tezlashish':<28} {after / before:>12.1f}x")
+
+        storage.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,488 @@
+"""
+Offline load test: N ta simulyatsiya qilingan foydalanuvchi butun suhbat bo'ylab
+
+Tarmoqsiz ishlaydi - Telegram Bot API va BACKEND_URL o'rniga lokal soxta
+serverlar ko'tariladi (ikkalasida ham kechikish va xatolik kiritish sozlanadi).
+Bot create_app() orqali haqiqiy sozlamalar, DB, OTP navbati va webhook server
+bilan yaratiladi, update'lar esa polling'dagidek application.update_queue ga
+qo'yiladi - ularni haqiqiy fetcher va PerChatUpdateProcessor ishlaydi.
+
+Har bir foydalanuvchi oqimi:
+    /start -> til -> "Kodni olish" -> contact -> (backend webhook orqali OTP) ->
+    kodni kiritish -> login (DB'da belgilanadi) -> /cancel -> /start -> asosiy menyu ->
+    "Admin bilan bog'lanish" -> sarlavha -> tavsif (admin guruhga yuboriladi)
+
+Natija: oqim o'tkazuvchanligi va har bir holat uchun p50/p95/p99 (ms).
+Login holatiga menyulardan o'tib bo'lmaydi, shuning uchun harness uni
+login_password_handler kabi DB'ga yozadi.
+
+Ishga tushirish:
+    python benchmarks/loadtest.py [--users 200] [--concurrency 50]
+        [--tg-latency-ms 30] [--tg-error-rate 0.01] [--tg-flood-rate 0]
+        [--backend-latency-ms 50] [--backend-error-rate 0.01] [--webhook-delay-ms 100]
+        [--real-limits] [--json natija.json]
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import random
+import re
+import socket
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import aiohttp  # noqa: E402
+from aiohttp import web  # noqa: E402
+from telegram import Update  # noqa: E402
+from telegram.ext import TypeHandler  # noqa: E402
+
+import bot  # noqa: E402
+from config import Settings  # noqa: E402
+from i18n import get_text, language_name  # noqa: E402
+from tracing import CORRELATION_HEADER, percentile  # noqa: E402
+
+LANG = 'uz'
+BOT_TOKEN = '123456:loadtest'
+ADMIN_GROUP_ID = -1001000000001
+OTP_PATTERN = re.compile(r'<b>(\d+)</b>')
+# Bot handler'laridan keyin ishlaydigan guruh - update to'liq ishlanganini bildiradi
+PROCESSED_GROUP = 1
+UPDATE_TIMEOUT = 30
+
+# Hisobotdagi qatorlar tartibi (handler holati yoki o'lchov nomi)
+ROWS = ('entry', 'LANG_SELECT', 'MAIN_CHOICE', 'CODE_PHONE', 'otp_delivery', 'LOGIN_CODE',
+        'fallback', 'entry/logged_in', 'MAIN_MENU', 'APPEAL_TITLE', 'APPEAL_DESC', 'flow')
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+async def inject_latency(latency_ms: float, jitter_ms: float):
+    delay = random.gauss(latency_ms, jitter_ms) if jitter_ms else latency_ms
+    if delay > 0:
+        await asyncio.sleep(delay / 1000)
+
+
+async def serve(app: web.Application, port: int) -> web.AppRunner:
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', port).start()
+    return runner
+
+
+class FakeTelegram:
+    """Bot API o'rnini bosuvchi server: POST /bot<token>/<method>
+
+    error_rate - 502 (PTB uchun NetworkError), flood_rate - 429 retry_after bilan.
+    expect() - chat'ga pattern'ga mos xabar yuborilishini kutish (OTP uchun).
+    """
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, flood_rate=0.0, retry_after=1):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.flood_rate = flood_rate
+        self.retry_after = retry_after
+        self.calls = Counter()
+        self.errors = Counter()
+        self._message_ids = itertools.count(1)
+        self._waiters = defaultdict(list)  # {chat_id: [(pattern, future)]}
+        self.app = web.Application()
+        self.app.router.add_post('/bot{token}/{method}', self.handle)
+
+    def expect(self, chat_id: int, pattern: re.Pattern) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self._waiters[chat_id].append((pattern, future))
+        return future
+
+    def _notify(self, chat_id: int, text: str):
+        waiters = self._waiters.get(chat_id)
+        if not waiters:
+            return
+        for item in list(waiters):
+            pattern, future = item
+            match = pattern.search(text)
+            if match:
+                waiters.remove(item)
+                if not future.done():
+                    future.set_result(match)
+        if not waiters:
+            del self._waiters[chat_id]
+
+    async def handle(self, request: web.Request):
+        method = request.match_info['method']
+        if request.content_type == 'application/json':
+            params = await request.json()
+        else:
+            params = dict(await request.post())
+        self.calls[method] += 1
+        await inject_latency(self.latency_ms, self.jitter_ms)
+
+        if method != 'getMe':
+            roll = random.random()
+            if roll < self.flood_rate:
+                self.errors[f"{method}:429"] += 1
+                return web.json_response({
+                    'ok': False, 'error_code': 429,
+                    'description': f"Too Many Requests: retry after {self.retry_after}",
+                    'parameters': {'retry_after': self.retry_after}
+                }, status=429)
+            if roll < self.flood_rate + self.error_rate:
+                self.errors[f"{method}:502"] += 1
+                return web.json_response({'ok': False, 'error_code': 502, 'description': 'Bad Gateway'}, status=502)
+
+        if method == 'getMe':
+            result = {'id': int(BOT_TOKEN.split(':')[0]), 'is_bot': True, 'first_name': 'Load Test',
+                      'username': 'loadtest_bot', 'can_join_groups': True,
+                      'can_read_all_group_messages': False, 'supports_inline_queries': False}
+        elif method == 'sendMessage':
+            chat_id = int(params['chat_id'])
+            text = params.get('text', '')
+            result = {
+                'message_id': next(self._message_ids),
+                'date': int(time.time()),
+                'chat': {'id': chat_id, 'type': 'private' if chat_id > 0 else 'supergroup'},
+                'text': text,
+            }
+            self._notify(chat_id, text)
+        else:
+            result = True
+        return web.json_response({'ok': True, 'result': result})
+
+
+class FakeBackend:
+    """BACKEND_URL auth endpoint'lari: POST /api/auth/<endpoint>
+
+    send-code so'rovidan keyin webhook_delay_ms o'tib kod bot'ning
+    /webhook/code manziliga (X-Correlation-ID qaytarilgan holda) yuboriladi.
+    """
+
+    CODE_ENDPOINTS = ('send-code', 'send-register-code', 'forgot-password')
+
+    def __init__(self, webhook_url: str, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, webhook_delay_ms=0.0):
+        self.webhook_url = webhook_url
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.webhook_delay_ms = webhook_delay_ms
+        self.calls = Counter()
+        self.errors = Counter()
+        self.webhooks = Counter()  # {bot javobi status kodi: soni}
+        self._session = None
+        self._tasks = set()
+        self.app = web.Application()
+        self.app.router.add_post('/api/auth/{endpoint}', self.handle)
+
+    async def start(self):
+        self._session = aiohttp.ClientSession()
+
+    async def close(self):
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self._session.close()
+
+    async def handle(self, request: web.Request):
+        endpoint = request.match_info['endpoint']
+        data = await request.json()
+        self.calls[endpoint] += 1
+        await inject_latency(self.latency_ms, self.jitter_ms)
+
+        if random.random() < self.error_rate:
+            self.errors[endpoint] += 1
+            return web.json_response({'success': False, 'message': 'Injected error'}, status=500)
+
+        if endpoint in self.CODE_ENDPOINTS:
+            phone = data.get('phoneNumber')
+            code = f"{random.randint(0, 999999):06d}"
+            task = asyncio.create_task(self._deliver(phone, code, request.headers.get(CORRELATION_HEADER)))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            return web.json_response({'success': True, 'message': 'Kod yuborildi'})
+        if endpoint == 'login':
+            return web.json_response({'success': True, 'data': {
+                'phoneNumber': data.get('phoneNumber'), 'fullName': 'Load Test', 'role': 'user',
+                'balans': '0', 'accessToken': 'a' * 64, 'refreshToken': 'r' * 64}})
+        if endpoint == 'verify-code':
+            return web.json_response({'success': True, 'data': {'resetToken': 't' * 32}})
+        return web.json_response({'success': True})
+
+    async def _deliver(self, phone: str, code: str, correlation_id: str = None):
+        await inject_latency(self.webhook_delay_ms, 0)
+        headers = {CORRELATION_HEADER: correlation_id} if correlation_id else {}
+        try:
+            async with self._session.post(self.webhook_url, json={'phoneNumber': phone, 'code': code},
+                                          headers=headers) as response:
+                self.webhooks[response.status] += 1
+        except aiohttp.ClientError as e:
+            self.webhooks[type(e).__name__] += 1
+
+
+class LoadTest:
+    """Foydalanuvchilarni suhbat bo'ylab yuritish va holatlar bo'yicha vaqtlarni yig'ish"""
+
+    def __init__(self, application, telegram: FakeTelegram, retries: int, otp_timeout: float, think_ms: float):
+        self.application = application
+        self.telegram = telegram
+        self.retries = retries
+        self.otp_timeout = otp_timeout
+        self.think_ms = think_ms
+        self.latencies = defaultdict(list)  # {qator: [soniya]}
+        self.failures = Counter()  # {qator: kutilgan holatga o'tmagan urinishlar}
+        self.completed = 0
+        self.aborted = 0
+        self.updates = 0
+        self._ids = itertools.count(1)
+        self._processing = {}  # {update_id: asyncio.Future}
+        application.add_handler(TypeHandler(Update, self._processed), group=PROCESSED_GROUP)
+
+    async def _processed(self, update: Update, context):
+        future = self._processing.pop(update.update_id, None)
+        if future is not None and not future.done():
+            future.set_result(None)
+
+    def make_update(self, user_id: int, text: str = None, phone: str = None) -> Update:
+        user = {'id': user_id, 'is_bot': False, 'first_name': f"User{user_id}", 'username': f"user{user_id}"}
+        message = {
+            'message_id': next(self._ids),
+            'date': int(time.time()),
+            'chat': {'id': user_id, 'type': 'private', 'first_name': user['first_name']},
+            'from': user,
+        }
+        if phone is not None:
+            message['contact'] = {'phone_number': phone, 'first_name': user['first_name'], 'user_id': user_id}
+        else:
+            message['text'] = text
+            if text.startswith('/'):
+                message['entities'] = [{'type': 'bot_command', 'offset': 0, 'length': len(text.split()[0])}]
+        return Update.de_json({'update_id': next(self._ids), 'message': message}, self.application.bot)
+
+    def state(self, user_id: int):
+        # Shaxsiy chat: kalit (chat_id, user_id)
+        return bot.conversation_handler._conversations.get((user_id, user_id))
+
+    async def step(self, row: str, user_id: int, expected_state, **message) -> bool:
+        """Bitta xabar - suhbat expected_state ga o'tguncha (retries marta qayta urinish)
+
+        Vaqt update navbatga qo'yilgandan bot handler'lari tugaguncha o'lchanadi
+        (update processor'dagi kutish ham kiradi).
+        """
+        for _ in range(self.retries + 1):
+            if self.think_ms:
+                await asyncio.sleep(self.think_ms / 1000)
+            update = self.make_update(user_id, **message)
+            processed = self._processing[update.update_id] = asyncio.get_running_loop().create_future()
+            started = time.perf_counter()
+            await self.application.update_queue.put(update)
+            try:
+                await asyncio.wait_for(processed, UPDATE_TIMEOUT)
+            except asyncio.TimeoutError:
+                self._processing.pop(update.update_id, None)
+                self.failures[row] += 1
+                continue
+            elapsed = time.perf_counter() - started
+            self.updates += 1
+            if self.state(user_id) == expected_state:
+                self.latencies[row].append(elapsed)
+                return True
+            self.failures[row] += 1
+        return False
+
+    async def run_user(self, user_id: int) -> bool:
+        phone = f"+99890{user_id:07d}"
+        flow_started = time.perf_counter()
+
+        if not await self.step('entry', user_id, bot.LANG_SELECT, text='/start'):
+            return False
+        if not await self.step('LANG_SELECT', user_id, bot.MAIN_CHOICE, text=language_name(LANG)):
+            return False
+        if not await self.step('MAIN_CHOICE', user_id, bot.CODE_PHONE, text=get_text(LANG, 'get_code')):
+            return False
+
+        # OTP xabarini contact yuborilishidan oldin kutishni boshlaymiz
+        otp = self.telegram.expect(user_id, OTP_PATTERN)
+        if not await self.step('CODE_PHONE', user_id, bot.LOGIN_CODE, phone=phone):
+            otp.cancel()
+            return False
+        started = time.perf_counter()
+        try:
+            match = await asyncio.wait_for(otp, self.otp_timeout)
+        except asyncio.TimeoutError:
+            self.failures['otp_delivery'] += 1
+            return False
+        self.latencies['otp_delivery'].append(time.perf_counter() - started)
+
+        if not await self.step('LOGIN_CODE', user_id, bot.MAIN_CHOICE, text=match.group(1)):
+            return False
+
+        # Muvaffaqiyatli login natijasi (login_password_handler saqlaydigan ma'lumotlar)
+        await bot.user_repo.save_user({
+            'user_id': user_id, 'phone': phone, 'full_name': f"User {user_id}", 'role': 'user',
+            'balans': '0', 'access_token': 'a' * 64, 'refresh_token': 'r' * 64,
+            'lang': LANG, 'logged_in': True
+        })
+        # Suhbat MAIN_CHOICE da - /start faqat suhbat tugagandan keyin qabul qilinadi
+        if not await self.step('fallback', user_id, None, text='/cancel'):
+            return False
+        if not await self.step('entry/logged_in', user_id, bot.MAIN_MENU, text='/start'):
+            return False
+        if not await self.step('MAIN_MENU', user_id, bot.APPEAL_TITLE, text=get_text(LANG, 'contact_admin')):
+            return False
+        if not await self.step('APPEAL_TITLE', user_id, bot.APPEAL_DESC, text=f"Load test {user_id}"):
+            return False
+        if not await self.step('APPEAL_DESC', user_id, bot.MAIN_MENU, text="Murojaat matni"):
+            return False
+
+        self.latencies['flow'].append(time.perf_counter() - flow_started)
+        return True
+
+    async def run(self, users: int, concurrency: int, first_user_id: int = 10_000_000) -> float:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def limited(user_id):
+            async with semaphore:
+                if await self.run_user(user_id):
+                    self.completed += 1
+                else:
+                    self.aborted += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(limited(first_user_id + i) for i in range(users)))
+        return time.perf_counter() - started
+
+    def summary(self) -> dict:
+        rows = {}
+        for row in ROWS:
+            values = sorted(self.latencies.get(row, ()))
+            rows[row] = {'count': len(values), 'failures': self.failures.get(row, 0)}
+            if values:
+                rows[row].update({f"p{p}_ms": round(percentile(values, p) * 1000, 2) for p in (50, 95, 99)})
+                rows[row]['max_ms'] = round(values[-1] * 1000, 2)
+        return rows
+
+
+def print_report(args, test: LoadTest, elapsed: float, telegram: FakeTelegram, backend: FakeBackend, otp_report):
+    print(f"\nFoydalanuvchilar: {args.users} (parallel {args.concurrency}), "
+          f"yakunlangan: {test.completed}, to'xtatilgan: {test.aborted}")
+    print(f"Vaqt: {elapsed:.2f} s, oqim: {test.completed / elapsed:.1f} user/s, "
+          f"{test.updates / elapsed:.1f} update/s\n")
+
+    print(f"{'holat':<18} {'soni':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} {'xato':>6}")
+    for row, item in test.summary().items():
+        if not item['count'] and not item['failures']:
+            continue
+        if item['count']:
+            print(f"{row:<18} {item['count']:>6} {item['p50_ms']:>9.1f} {item['p95_ms']:>9.1f} "
+                  f"{item['p99_ms']:>9.1f} {item['max_ms']:>9.1f} {item['failures']:>6}")
+        else:
+            print(f"{row:<18} {0:>6} {'-':>9} {'-':>9} {'-':>9} {'-':>9} {item['failures']:>6}")
+
+    print("\nBot ichidagi OTP bosqichlari (soniya):")
+    for segment, item in otp_report['segments'].items():
+        print(f"  {segment:<16} p50 {item['p50']:.3f}  p95 {item['p95']:.3f}  p99 {item['p99']:.3f}")
+
+    print(f"\nTelegram so'rovlari: {dict(telegram.calls)}, kiritilgan xatoliklar: {dict(telegram.errors)}")
+    print(f"Backend so'rovlari: {dict(backend.calls)}, kiritilgan xatoliklar: {dict(backend.errors)}")
+    print(f"Webhook javoblari: {dict(backend.webhooks)}")
+
+
+async def run_load_test(args):
+    telegram_port, backend_port, webhook_port = free_port(), free_port(), free_port()
+
+    telegram = FakeTelegram(args.tg_latency_ms, args.tg_jitter_ms, args.tg_error_rate, args.tg_flood_rate)
+    backend = FakeBackend(f"http://127.0.0.1:{webhook_port}/webhook/code", args.backend_latency_ms,
+                          args.backend_jitter_ms, args.backend_error_rate, args.webhook_delay_ms)
+    runners = [await serve(telegram.app, telegram_port), await serve(backend.app, backend_port)]
+    await backend.start()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            'BOT_TOKEN': BOT_TOKEN,
+            'BACKEND_URL': f"http://127.0.0.1:{backend_port}",
+            'ADMIN_GROUP_ID': str(ADMIN_GROUP_ID),
+            'WEBHOOK_PORT': str(webhook_port),
+            'TELEGRAM_API_URL': f"http://127.0.0.1:{telegram_port}/bot",
+            'DB_FILE': os.path.join(tmp, 'users.db'),
+            'SESSION_BACKEND': args.session_backend,
+        }
+        if not args.real_limits:
+            # Telegram limitlari o'lchovni bosib ketmasligi uchun (--real-limits - haqiqiy limitlar bilan)
+            env.update({'TELEGRAM_GLOBAL_RATE': '1000000', 'TELEGRAM_CHAT_RATE': '1000000',
+                        'TELEGRAM_GROUP_RATE_PER_MINUTE': '60000000'})
+
+        # run_polling() bilan bir xil tartib (polling'siz): initialize, post_init, start ... stop, post_stop, shutdown, post_shutdown
+        application = bot.create_app(Settings(env))
+        await application.initialize()
+        await bot.start_background_tasks(application)
+        await application.start()
+        try:
+            test = LoadTest(application, telegram, args.retries, args.otp_timeout, args.think_ms)
+            elapsed = await test.run(args.users, args.concurrency)
+            otp_report = bot.otp_tracker.report()
+        finally:
+            await application.stop()
+            await bot.stop_background_tasks(application)
+            await application.shutdown()
+            await bot.shutdown_clients(application)
+
+    await backend.close()
+    for runner in runners:
+        await runner.cleanup()
+
+    print_report(args, test, elapsed, telegram, backend, otp_report)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({
+                'users': args.users, 'concurrency': args.concurrency,
+                'completed': test.completed, 'aborted': test.aborted,
+                'elapsed_s': round(elapsed, 3),
+                'throughput_users_per_s': round(test.completed / elapsed, 2),
+                'throughput_updates_per_s': round(test.updates / elapsed, 2),
+                'states': test.summary(),
+                'otp_delivery': otp_report,
+            }, f, ensure_ascii=False, indent=2)
+        print(f"\n📝 Natija yozildi: {args.json}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--tg-latency-ms', type=float, default=30)
+    parser.add_argument('--tg-jitter-ms', type=float, default=10)
+    parser.add_argument('--tg-error-rate', type=float, default=0.0, help="502 javoblar ulushi (0..1)")
+    parser.add_argument('--tg-flood-rate', type=float, default=0.0, help="429 retry_after javoblar ulushi (0..1)")
+    parser.add_argument('--backend-latency-ms', type=float, default=50)
+    parser.add_argument('--backend-jitter-ms', type=float, default=15)
+    parser.add_argument('--backend-error-rate', type=float, default=0.0, help="500 javoblar ulushi (0..1)")
+    parser.add_argument('--webhook-delay-ms', type=float, default=100,
+                        help="send-code dan keyin backend webhook'ni chaqirguncha")
+    parser.add_argument('--think-ms', type=float, default=0, help="foydalanuvchi xabarlari orasidagi pauza")
+    parser.add_argument('--retries', type=int, default=3, help="holat o'zgarmasa xabarni qayta yuborish")
+    parser.add_argument('--otp-timeout', type=float, default=30)
+    parser.add_argument('--session-backend', choices=('memory', 'sqlite'), default='memory')
+    parser.add_argument('--real-limits', action='store_true', help="Telegram rate limitlarini o'chirmaslik")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--json', help="natijani JSON faylga yozish")
+    parser.add_argument('--verbose', action='store_true', help="bot INFO loglarini ko'rsatish")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    asyncio.run(run_load_test(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,266 @@
+"""
+bot.py issiq funksiyalari uchun mikrobenchmark'lar va baseline bilan solishtirish
+
+O'lchanadi: get_text, barcha get_*_keyboard, normalize_phone_for_comparison,
+validate_phone, get_backend_url, safe_json_parse, get_profile_message,
+webhook telefon lookup'i (10k/100k session, memory va sqlite) hamda
+to'ldirilgan users.db da get_user/save_user.
+
+Har bir benchmark timeit bilan o'lchanadi: bitta seriya kamida --min-time
+soniya, --repeat seriyadan eng tezi (min) baseline'ga yoziladi va solishtiriladi
+(median ham saqlanadi). Baseline faqat shu mashinada olingan natija bilan
+solishtirilganda ma'noli - meta'dagi python/platform farq qilsa ogohlantiriladi.
+
+Ishga tushirish:
+    python benchmarks/microbench.py --save              # benchmarks/baseline.json ga yozish
+    python benchmarks/microbench.py --compare           # baseline bilan solishtirish
+    python benchmarks/microbench.py --compare --threshold 15 --filter keyboard
+
+--compare regressiya topilsa 1 kod bilan chiqadi (CI uchun).
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+from datetime import datetime, timezone
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT)
+
+import httpx  # noqa: E402
+
+import bot  # noqa: E402
+import keyboards  # noqa: E402
+from bench_storage import populate  # noqa: E402
+from config import Settings  # noqa: E402
+from i18n import get_text  # noqa: E402
+from sessions import UPSERT_SESSION_SQL, create_session_store, normalize_phone_for_comparison  # noqa: E402
+from storage import UserStorage, connect  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+
+PROFILE_USER = {
+    'user_id': 123456789, 'phone': '+998901234567', 'full_name': 'Test User', 'role': 'user',
+    'balans': '150000', 'access_token': 'a' * 64, 'refresh_token': 'r' * 64, 'lang': 'uz', 'logged_in': True,
+}
+
+
+def phone_for(index: int) -> str:
+    return f"+99890{index:07d}"
+
+
+def keyboard_benchmarks(lang):
+    """keyboards.py dagi barcha get_*_keyboard funksiyalari (lang parametri bo'lsa lang bilan)"""
+    benches = []
+    for name in sorted(dir(keyboards)):
+        func = getattr(keyboards, name)
+        if not (name.startswith('get_') and name.endswith('_keyboard') and callable(func)):
+            continue
+        if func.__code__.co_argcount:
+            benches.append((f"{name}[{lang}]", lambda func=func: func(lang)))
+        else:
+            benches.append((name, func))
+    return benches
+
+
+def session_benchmarks(tmp, sizes, backends):
+    """Webhook'dagi telefon -> chat_id lookup (resolve normalize ham qiladi)"""
+    benches, stores = [], []
+    for backend in backends:
+        for size in sizes:
+            db_file = os.path.join(tmp, f"sessions_{backend}_{size}.db")
+            if backend == 'sqlite':
+                schema = UserStorage(db_file)
+                schema.init_db()
+                schema.close()
+            store = create_session_store(backend, db_file, ttl=3600, maxsize=size)
+            if backend == 'sqlite':
+                # Bitta tranzaksiyada to'ldirish (bind har safar commit qiladi)
+                conn = connect(db_file)
+                expires_at = time.time() + 3600
+                conn.executemany(UPSERT_SESSION_SQL, (
+                    (normalize_phone_for_comparison(phone_for(i)), i, expires_at) for i in range(size)))
+                conn.commit()
+                conn.close()
+            else:
+                for i in range(size):
+                    store.bind(phone_for(i), i)
+            # Webhook'dagi format (998...) - store o'zi normalize qiladi
+            phones = itertools.cycle([phone_for(random.randrange(size))[1:] for _ in range(1000)])
+            label = f"{size // 1000}k" if size % 1000 == 0 else str(size)
+            benches.append((f"webhook_lookup[{backend},{label}]", lambda store=store, phones=phones:
+                            store.resolve(next(phones))))
+            stores.append(store)
+    return benches, stores
+
+
+def user_benchmarks(tmp, users):
+    """To'ldirilgan users.db da UserStorage.get_user/save_user"""
+    storage = UserStorage(os.path.join(tmp, 'users.db'))
+    storage.init_db()
+    populate(storage, users)
+
+    ids = itertools.cycle([random.randint(1, users) for _ in range(1000)])
+    missing = itertools.count(users + 1)
+    updates = itertools.cycle([{**PROFILE_USER, 'user_id': random.randint(1, users)} for _ in range(1000)])
+    benches = [
+        ('get_user[hit]', lambda: storage.get_user(next(ids))),
+        ('get_user[miss]', lambda: storage.get_user(next(missing))),
+        ('save_user[update]', lambda: storage.save_user(next(updates))),
+    ]
+    return benches, storage
+
+
+def collect(tmp, args):
+    """Barcha benchmark'lar: [(nom, funksiya)] va yopiladigan resurslar"""
+    bot.settings = Settings({'BACKEND_URL': 'http://localhost:8080'})
+    json_response = httpx.Response(200, json={'success': True, 'data': {'accessToken': 'a' * 64, 'role': 'user'}})
+    html_response = httpx.Response(502, text='<html><body>502 Bad Gateway</body></html>')
+
+    benches = [
+        ('get_text[uz]', lambda: get_text('uz', 'welcome')),
+        ('get_text[ru]', lambda: get_text('ru', 'main_choice')),
+        ('get_text[missing_key]', lambda: get_text('en', 'no_such_key')),
+        *keyboard_benchmarks('uz'),
+        ('normalize_phone_for_comparison', lambda: normalize_phone_for_comparison('+998 (90) 123-45-67')),
+        ('validate_phone', lambda: bot.validate_phone('+998901234567')),
+        ('get_backend_url', lambda: bot.get_backend_url('auth/send-code')),
+        ('safe_json_parse[json]', lambda: bot.safe_json_parse(json_response)),
+        ('safe_json_parse[html]', lambda: bot.safe_json_parse(html_response)),
+        ('get_profile_message', lambda: bot.get_profile_message(PROFILE_USER, 'uz')),
+    ]
+    session_benches, stores = session_benchmarks(tmp, args.sessions, args.session_backends)
+    user_benches, storage = user_benchmarks(tmp, args.users)
+    return benches + session_benches + user_benches, [*stores, storage]
+
+
+def measure(func, min_time: float, repeat: int) -> dict:
+    """Bitta chaqiriq vaqti (ns): eng tez va median seriya"""
+    timer = timeit.Timer(func)
+    number, elapsed = timer.autorange()
+    number = max(1, round(number * min_time / elapsed))
+    timings = [timer.timeit(number) / number * 1e9 for _ in range(repeat)]
+    return {'min_ns': round(min(timings), 1), 'median_ns': round(statistics.median(timings), 1),
+            'number': number, 'repeat': repeat}
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(args) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        benches, resources = collect(tmp, args)
+        try:
+            for name, func in benches:
+                if args.filter and args.filter not in name:
+                    continue
+                results[name] = measure(func, args.min_time, args.repeat)
+                print(f"{name:<42} {results[name]['min_ns']:>12,.0f} ns  (median {results[name]['median_ns']:,.0f})")
+        finally:
+            for resource in resources:
+                resource.close()
+    return {
+        'meta': {
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'machine': platform.machine(),
+            'users': args.users,
+        },
+        'results': results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float, noise_ns: float = 0, name_filter: str = None) -> list:
+    """Baseline'dan threshold foizdan (va kamida noise_ns dan) ko'p sekinlashgan benchmark'lar ro'yxati"""
+    for key in ('python', 'platform', 'machine'):
+        if baseline['meta'].get(key) != current['meta'].get(key):
+            print(f"⚠️ Baseline boshqa muhitda olingan ({key}: {baseline['meta'].get(key)} != "
+                  f"{current['meta'].get(key)}) - natijalar solishtirib bo'lmasligi mumkin")
+
+    print(f"\nBaseline: {baseline['meta'].get('created')} (commit {baseline['meta'].get('commit')}), "
+          f"chegara {threshold:.0f}%\n")
+    print(f"{'benchmark':<42} {'baseline ns':>12} {'hozir ns':>12} {'farq':>8}")
+    regressions = []
+    for name, result in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            print(f"{name:<42} {'-':>12} {result['min_ns']:>12,.0f} {'yangi':>8}")
+            continue
+        delta = result['min_ns'] - base['min_ns']
+        change = delta / base['min_ns'] * 100
+        status = ''
+        if abs(delta) < noise_ns:
+            pass
+        elif change > threshold:
+            status = '  🔴 regressiya'
+            regressions.append((name, change))
+        elif change < -threshold:
+            status = '  🟢 tezlashdi'
+        print(f"{name:<42} {base['min_ns']:>12,.0f} {result['min_ns']:>12,.0f} {change:>+7.1f}%{status}")
+    for name in sorted(baseline['results'].keys() - current['results'].keys()):
+        if name_filter and name_filter not in name:
+            continue
+        print(f"{name:<42} {baseline['results'][name]['min_ns']:>12,.0f} {'-':>12} {"yo'q":>8}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--save', nargs='?', const=DEFAULT_BASELINE, help="natijani baseline sifatida yozish")
+    parser.add_argument('--compare', nargs='?', const=DEFAULT_BASELINE, help="baseline bilan solishtirish")
+    parser.add_argument('--threshold', type=float, default=10, help="regressiya chegarasi (foiz)")
+    parser.add_argument('--noise-ns', type=float, default=20,
+                        help="bundan kichik farq (ns) shovqin hisoblanadi - juda tez funksiyalar uchun")
+    parser.add_argument('--filter', help="faqat nomida shu matn bor benchmark'lar")
+    parser.add_argument('--min-time', type=float, default=0.2, help="bitta seriya davomiyligi (soniya)")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--users', type=int, default=10000, help="users.db dagi foydalanuvchilar soni")
+    parser.add_argument('--sessions', type=lambda value: [int(item) for item in value.split(',')],
+                        default=[10000, 100000], help="session'lar soni (vergul bilan)")
+    parser.add_argument('--session-backends', type=lambda value: value.split(','), default=['memory', 'sqlite'])
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    if args.compare and not os.path.exists(args.compare):
+        parser.error(f"baseline topilmadi: {args.compare} (avval --save bilan yarating)")
+
+    random.seed(args.seed)
+    current = run_benchmarks(args)
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(current, f, ensure_ascii=False, indent=2)
+            f.write('\n')
+        print(f"\n📝 Baseline yozildi: {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, current, args.threshold, args.noise_ns, args.filter)
+        if regressions:
+            print(f"\n❌ {len(regressions)} ta regressiya (>{args.threshold:.0f}%): "
+                  + ', '.join(f"{name} {change:+.1f}%" for name, change in regressions))
+            sys.exit(1)
+        print("\n✅ Regressiya yo'q")
+
+
+if __name__ == '__main__':
+    main()
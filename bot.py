@@ -1,8 +1,5 @@
 import logging
-import os
-import sqlite3
-from dotenv import load_dotenv
-from telegram import Update, ReplyKeyboardMarkup, KeyboardButton, ReplyKeyboardRemove
+from telegram import Update, ReplyKeyboardRemove
 from telegram.ext import (
     Application,
     CommandHandler,
@@ -11,20 +8,43 @@ from telegram.ext import (
     ContextTypes,
     filters,
 )
-import requests
 from datetime import datetime
-import threading
 import asyncio
-from flask import Flask, request, jsonify
-
-# .env faylni yuklash
-load_dotenv()
-
-# Logging sozlamalari
-logging.basicConfig(
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    level=logging.INFO
+import functools
+import signal
+import time
+from aiohttp import web
+from config import Settings, load_settings
+from backend_client import BackendClient
+import http_pool
+import metrics
+from logging_setup import setup_logging
+from storage import UserStorage, UserRepository
+from sessions import create_session_store, normalize_phone_for_comparison
+from webhook_server import WebhookServer
+from otp_delivery import OTPDeliveryQueue
+from persistence import SQLitePersistence
+from update_processor import PerChatUpdateProcessor
+from tracing import CORRELATION_HEADER, OTPTracker, Tracer
+from outbound import OutboundScheduler, PRIORITY_OTP, PRIORITY_ADMIN
+from i18n import (
+    get_text,
+    reload_translations,
+    configure_translations,
+    validate_translations,
+    catalog as translation_catalog,
 )
+from keyboards import (
+    get_lang_keyboard,
+    get_main_menu_keyboard,
+    get_back_keyboard,
+    get_phone_contact_keyboard,
+    get_main_choice_keyboard,
+    get_code_menu_keyboard,
+    get_otp_back_keyboard,
+)
+from routing import route, is_back, MENU_LANG, MENU_MAIN_CHOICE, MENU_CODE, MENU_MAIN
+
 logger = logging.getLogger(__name__)
 
 # Holatlar
@@ -33,36 +53,81 @@ logger = logging.getLogger(__name__)
  FORGOT_PASSWORD_CODE, FORGOT_PASSWORD_NEW_PASSWORD,
  REGISTER_DATA, LOGIN_PASSWORD) = range(14)
 
-# Sozlamalar .env dan
-BACKEND_URL = os.getenv("BACKEND_URL")
-ADMIN_GROUP_ID = os.getenv("ADMIN_GROUP_ID")
-BOT_TOKEN = os.getenv("BOT_TOKEN")
-WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "3001"))
+# Metrikalardagi holat nomlari
+STATE_NAMES = {
+    LANG_SELECT: 'LANG_SELECT',
+    MAIN_CHOICE: 'MAIN_CHOICE',
+    GET_CODE_MENU: 'GET_CODE_MENU',
+    CODE_PHONE: 'CODE_PHONE',
+    CODE_VERIFY: 'CODE_VERIFY',
+    LOGIN_CODE: 'LOGIN_CODE',
+    MAIN_MENU: 'MAIN_MENU',
+    CHANGE_PHONE: 'CHANGE_PHONE',
+    APPEAL_TITLE: 'APPEAL_TITLE',
+    APPEAL_DESC: 'APPEAL_DESC',
+    FORGOT_PASSWORD_CODE: 'FORGOT_PASSWORD_CODE',
+    FORGOT_PASSWORD_NEW_PASSWORD: 'FORGOT_PASSWORD_NEW_PASSWORD',
+    REGISTER_DATA: 'REGISTER_DATA',
+    LOGIN_PASSWORD: 'LOGIN_PASSWORD',
+}
 
-# User sessions - phone -> chat_id mapping (webhook uchun)
-user_sessions = {}  # {phone_number: chat_id}
+# Sozlamalar - create_app() da o'rnatiladi (import paytida .env o'qilmaydi)
+settings = None
 
-def normalize_phone_for_comparison(phone: str) -> str:
-    """Telefon raqamni normalize qilish (solishtirish uchun)"""
-    if not phone:
-        return ""
-    
-    # Faqat raqamlarni olish
-    digits = ''.join(filter(str.isdigit, phone))
-    
-    # Agar +998 bilan boshlanmasa, qo'shamiz
-    if digits.startswith('998'):
-        return '+998' + digits[3:]  # +998901234567
-    elif digits.startswith('8'):
-        return '+998' + digits[1:]  # +998901234567
-    else:
-        return '+998' + digits  # +998901234567
+# Webhook server marshrutlari (aiohttp, bot bilan bitta event loop'da)
+webhook_routes = web.RouteTableDef()
+webhook_server = None
 
-# Flask app for webhook
-flask_app = Flask(__name__)
-
-# Telegram bot application (global variable, will be set in main())
+# Telegram bot application va unga bog'liq obyektlar - hammasi create_app() da yaratiladi
 telegram_application = None
+outbound_scheduler = None  # chiquvchi Telegram so'rovlari (rate limit + ustuvorlik)
+storage = None
+user_repo = None  # handler'lar DB bilan faqat shu asinxron repository orqali ishlaydi
+bot_persistence = None
+user_sessions = None  # phone -> chat_id mapping (webhook uchun)
+otp_queue = None
+otp_tracker = None  # send-code -> webhook -> Telegram ack bosqichlari
+conversation_handler = None
+
+# Metrikalar (GET /metrics)
+HANDLER_LATENCY = metrics.Histogram(
+    'bot_handler_duration_seconds', "Handler'lar davomiyligi (holat bo'yicha)", ['state', 'handler'])
+HANDLER_ERRORS = metrics.Counter(
+    'bot_handler_errors', "Handler'larda ushlanmagan xatoliklar", ['state', 'handler'])
+WEBHOOK_REQUESTS = metrics.Counter(
+    'webhook_code_requests', "POST /webhook/code natijalari (hit - session topildi, miss - topilmadi)", ['result'])
+
+def count_active_conversations():
+    """Har bir holatdagi faol suhbatlar soni"""
+    counts = {(name,): 0 for name in STATE_NAMES.values()}
+    if conversation_handler is not None:
+        # PTB ochiq API bermaydi - ConversationHandler ichidagi {key: holat} dict'ini o'qiymiz
+        for state in conversation_handler._conversations.values():
+            name = STATE_NAMES.get(state)
+            if name is not None:
+                counts[(name,)] += 1
+    return counts
+
+ACTIVE_CONVERSATIONS = metrics.Gauge(
+    'bot_active_conversations', "Faol suhbatlar soni (holat bo'yicha)", ['state'],
+    function=count_active_conversations)
+
+def instrument_handler(state_name, callback):
+    """Handler davomiyligi va xatoliklarini metrikalarga yozish"""
+    @functools.wraps(callback)
+    async def wrapper(update, context):
+        started = time.perf_counter()
+        try:
+            return await callback(update, context)
+        except Exception:
+            HANDLER_ERRORS.inc(state=state_name, handler=callback.__name__)
+            raise
+        finally:
+            HANDLER_LATENCY.observe(time.perf_counter() - started, state=state_name, handler=callback.__name__)
+    return wrapper
+
+# Fon vazifalari (post_init da yaratiladi, post_shutdown da to'xtatiladi)
+background_tasks = []
 
 # Helper funksiya: Response'ni xavfsiz parse qilish
 def safe_json_parse(response):
@@ -81,11 +146,11 @@ def safe_json_parse(response):
 # BACKEND_URL ni to'g'ri formatlash
 def get_backend_url(endpoint):
     """Backend URL ni to'g'ri formatlash"""
-    if not BACKEND_URL:
+    if not settings.backend_url:
         return None
     
     # BACKEND_URL ni tozalash
-    base_url = BACKEND_URL.strip().rstrip('/')
+    base_url = settings.backend_url.strip().rstrip('/')
     
     # URL formatini tekshirish va tuzatish
     # Agar https:/ yoki http:/ bo'lsa (bir /), tuzatish
@@ -113,320 +178,28 @@ def get_backend_url(endpoint):
         else:
             return f"{base_url}/api/{endpoint}"
 
-# Database fayli
-DB_FILE = "users.db"
-
-# Database yaratish
-def init_db():
-    """Database va jadvalni yaratish"""
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            user_id INTEGER PRIMARY KEY,
-            phone TEXT NOT NULL,
-            full_name TEXT,
-            role TEXT,
-            balans TEXT,
-            access_token TEXT,
-            refresh_token TEXT,
-            lang TEXT DEFAULT 'uz',
-            logged_in BOOLEAN DEFAULT FALSE,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    conn.commit()
-    conn.close()
-    logger.info("✅ Database initialized")
-
-def get_user(user_id):
-    """Foydalanuvchini olish"""
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    cursor.execute('SELECT * FROM users WHERE user_id = ?', (user_id,))
-    user = cursor.fetchone()
-    conn.close()
-    
-    if user:
-        return {
-            'user_id': user[0],
-            'phone': user[1],
-            'full_name': user[2],
-            'role': user[3],
-            'balans': user[4],
-            'access_token': user[5],
-            'refresh_token': user[6],
-            'lang': user[7],
-            'logged_in': bool(user[8])
-        }
-    return None
+# Backend API klienti (barcha handler'lar await qiladi)
+backend = BackendClient(get_backend_url)
 
-def save_user(user_data):
-    """Foydalanuvchini saqlash/yangilash"""
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        INSERT OR REPLACE INTO users 
-        (user_id, phone, full_name, role, balans, access_token, refresh_token, lang, logged_in, updated_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-    ''', (
-        user_data['user_id'],
-        user_data['phone'],
-        user_data['full_name'],
-        user_data['role'],
-        user_data['balans'],
-        user_data['access_token'],
-        user_data['refresh_token'],
-        user_data['lang'],
-        user_data['logged_in']
-    ))
-    
-    conn.commit()
-    conn.close()
-
-def logout_user(user_id):
-    """Foydalanuvchini logout qilish"""
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    cursor.execute('UPDATE users SET logged_in = FALSE WHERE user_id = ?', (user_id,))
-    conn.commit()
-    conn.close()
-
-# Database ni ishga tushirish
-init_db()
-
-# Tarjimalar
-TRANSLATIONS = {
-    'uz': {
-        'welcome': "👋 Xush kelibsiz!\n\nIltimos, tilni tanlang:",
-        'send_phone': "📱 Telefon raqamingizni yuboring:",
-        'send_password': "🔐 Parolingizni kiriting:",
-        'login_success': "✅ Xush kelibsiz!\n\nSiz tizimga muvaffaqiyatli kirdingiz.",
-        'login_failed': "❌ Xatolik!\n\nTelefon raqam yoki parol noto'g'ri.\n\nIltimos, qaytadan urinib ko'ring.",
-        'connection_error': "⚠️ Serverga ulanishda xatolik!\n\nIltimos, keyinroq qayta urinib ko'ring.",
-        'main_menu': "📋 Asosiy menyu\n\nKerakli bo'limni tanlang:",
-        'profile': "👤 Profil",
-        'change_phone': "📱 Raqamni o'zgartirish",
-        'contact_admin': "📨 Adminga murojaat",
-        'settings': "⚙️ Sozlamalar",
-        'back': "🔙 Orqaga",
-        'enter_new_phone': "📱 Yangi telefon raqamingizni kiriting:",
-        'phone_updated': "✅ Raqam yangilandi!\n\nYangi raqamingiz muvaffaqiyatli saqlandi.",
-        'enter_appeal_title': "📝 Murojaat sarlavhasini kiriting:\n\n💡 Qisqa va aniq yozing",
-        'enter_appeal_desc': "📄 Murojaat matnini kiriting:\n\n💡 Batafsil yozing",
-        'appeal_sent': "✅ Yuborildi!\n\nMurojaatingiz adminga yetkazildi.\nTez orada javob beramiz.",
-        'cancel': "❌ Bekor qilish",
-        'choose_lang': "🌐 Tilni tanlang",
-        'logout': "🚪 Chiqish",
-        'uz': "🇺🇿 O'zbekcha",
-        'ru': "🇷🇺 Русский",
-        'en': "🇬🇧 English",
-        'user_info': "👤 Profil ma'lumotlari\n\n📱 Telefon: {}\n🌐 Til: {}\n📅 Sana: {}",
-        'invalid_phone': "❌ Noto'g'ri format!\n\nIltimos, to'g'ri telefon raqam kiriting.",
-        'welcome_back': "👋 Xush kelibsiz, {}!\n\nSiz allaqachon tizimga kirgansiz.",
-        'logout_success': "✅ Siz tizimdan muvaffaqiyatli chiqdingiz.\n\nQaytadan kirish uchun /start ni bosing.",
-        'language_changed': "Til muvaffaqiyatli o'zgartirildi!",
-        'forgot_password': "🔑 Parolni tiklash",
-        'forgot_password_phone': "📱 Parolni tiklash uchun telefon raqamingizni kiriting:",
-        'forgot_password_code_sent': "✅ Kod yuborildi!\n\n🔐 Tasdiqlash kodingiz: <b>{}</b>\n\nKodni kiriting:",
-        'forgot_password_enter_code': "🔐 Tasdiqlash kodini kiriting:",
-        'forgot_password_code_verified': "✅ Kod tasdiqlandi!\n\nYangi parolingizni kiriting (kamida 6 ta belgi):",
-        'forgot_password_enter_new': "🔑 Yangi parolingizni kiriting (kamida 6 ta belgi):",
-        'forgot_password_success': "✅ Parol muvaffaqiyatli o'zgartirildi!\n\nEndi yangi parolingiz bilan kirishingiz mumkin.",
-        'forgot_password_error': "❌ Xatolik: {}",
-        'invalid_code': "❌ Noto'g'ri kod!\n\nIltimos, qaytadan urinib ko'ring.",
-        'password_too_short': "❌ Parol kamida 6 ta belgidan iborat bo'lishi kerak!",
-        'send_phone_contact': "📱 Telefon raqamni yuborish",
-        'forgot_password_welcome': "🔑 Parolni tiklash\n\nParolni tiklash uchun telefon raqamingizni yuboring:",
-        'login_or_reset': "🔐 Kirish yoki parolni tiklash\n\nKerakli bo'limni tanlang:",
-        'login': "🔐 Kirish",
-        'register': "📝 Ro'yxatdan o'tish",
-        'reset_password': "🔑 Parolni tiklash",
-        'main_choice': "🔐 Kerakli bo'limni tanlang:",
-        'get_code': "📱 Kodni olish",
-        'get_code_menu': "📱 Kodni olish\n\nKerakli bo'limni tanlang:",
-        'get_code_login': "🔐 Kirish uchun kod",
-        'get_code_register': "📝 Ro'yxatdan o'tish uchun kod",
-        'get_code_forgot': "🔑 Parolni tiklash uchun kod",
-        'register_phone': "📝 Ro'yxatdan o'tish uchun telefon raqamingizni yuboring:",
-        'register_code_sent': "✅ Kod yuborildi!\n\n🔐 Tasdiqlash kodingiz: <b>{}</b>\n\nKodni kiriting:",
-        'register_enter_code': "🔐 Tasdiqlash kodini kiriting:",
-        'register_enter_data': "📝 Ro'yxatdan o'tish ma'lumotlari\n\nQuyidagi formatda kiriting:\n\n<b>Ism|Parol|Role</b>\n\nMasalan:\n<b>John Doe|password123|user</b>",
-        'register_success': "✅ Muvaffaqiyatli ro'yxatdan o'tdingiz!",
-        'login_code_sent': "✅ Kod yuborildi!\n\n🔐 Tasdiqlash kodingiz: <b>{}</b>\n\nKodni kiriting:",
-        'login_enter_code': "🔐 Tasdiqlash kodini kiriting:",
-        'admin_login_success': "✅ Admin sifatida muvaffaqiyatli kirildingiz!"
-    },
-    'ru': {
-        'welcome': "👋 Добро пожаловать!\n\nПожалуйста, выберите язык:",
-        'send_phone': "📱 Отправьте ваш номер телефона:",
-        'send_password': "🔐 Введите ваш пароль:",
-        'login_success': "✅ Добро пожаловать!\n\nВы успешно вошли в систему.",
-        'login_failed': "❌ Ошибка!\n\nНеверный номер телефона или пароль.\n\nПожалуйста, попробуйте снова.",
-        'connection_error': "⚠️ Ошибка подключения к серверу!\n\nПожалуйста, попробуйте позже.",
-        'main_menu': "📋 Главное меню\n\nВыберите нужный раздел:",
-        'profile': "👤 Профиль",
-        'change_phone': "📱 Изменить номер",
-        'contact_admin': "📨 Связаться с админом",
-        'settings': "⚙️ Настройки",
-        'back': "🔙 Назад",
-        'enter_new_phone': "📱 Введите новый номер телефона:",
-        'phone_updated': "✅ Номер обновлен!\n\nВаш новый номер успешно сохранен.",
-        'enter_appeal_title': "📝 Введите заголовок обращения:\n\n💡 Кратко и ясно",
-        'enter_appeal_desc': "📄 Введите текст обращения:\n\n💡 Подробно опишите вашу проблему",
-        'appeal_sent': "✅ Отправлено!\n\nВаше обращение доставлено админу.\nМы ответим в ближайшее время.",
-        'cancel': "❌ Отмена",
-        'choose_lang': "🌐 Выберите язык",
-        'logout': "🚪 Выйти",
-        'uz': "🇺🇿 O'zbekcha",
-        'ru': "🇷🇺 Русский",
-        'en': "🇬🇧 English",
-        'user_info': "👤 Информация профиля\n\n📱 Телефон: {}\n🌐 Язык: {}\n📅 Дата: {}",
-        'invalid_phone': "❌ Неверный формат!\n\nПожалуйста, введите правильный номер.",
-        'welcome_back': "👋 Добро пожаловать, {}!\n\nВы уже вошли в систему.",
-        'logout_success': "✅ Вы успешно вышли из системы.\n\nНажмите /start чтобы войти снова.",
-        'language_changed': "Язык успешно изменен!",
-        'forgot_password': "🔑 Восстановить пароль",
-        'forgot_password_phone': "📱 Введите ваш номер телефона для восстановления пароля:",
-        'forgot_password_code_sent': "✅ Код отправлен!\n\n🔐 Ваш код подтверждения: <b>{}</b>\n\nВведите код:",
-        'forgot_password_enter_code': "🔐 Введите код подтверждения:",
-        'forgot_password_code_verified': "✅ Код подтвержден!\n\nВведите новый пароль (минимум 6 символов):",
-        'forgot_password_enter_new': "🔑 Введите новый пароль (минимум 6 символов):",
-        'forgot_password_success': "✅ Пароль успешно изменен!\n\nТеперь вы можете войти с новым паролем.",
-        'forgot_password_error': "❌ Ошибка: {}",
-        'invalid_code': "❌ Неверный код!\n\nПожалуйста, попробуйте снова.",
-        'password_too_short': "❌ Пароль должен содержать минимум 6 символов!",
-        'send_phone_contact': "📱 Отправить номер телефона",
-        'forgot_password_welcome': "🔑 Восстановление пароля\n\nОтправьте ваш номер телефона для восстановления пароля:",
-        'main_choice': "🔐 Выберите нужный раздел:",
-        'login': "🔐 Вход",
-        'get_code': "📱 Получить код",
-        'get_code_menu': "📱 Получить код\n\nВыберите нужный раздел:",
-        'get_code_login': "🔐 Код для входа",
-        'get_code_register': "📝 Код для регистрации",
-        'get_code_forgot': "🔑 Код для восстановления пароля",
-        'register_phone': "📝 Отправьте ваш номер телефона для регистрации:",
-        'register_code_sent': "✅ Код отправлен!\n\n🔐 Ваш код подтверждения: <b>{}</b>\n\nВведите код:",
-        'register_enter_code': "🔐 Введите код подтверждения:",
-        'register_enter_data': "📝 Данные для регистрации\n\nВведите в следующем формате:\n\n<b>Имя|Пароль|Роль</b>\n\nНапример:\n<b>Иван Иванов|password123|user</b>",
-        'register_success': "✅ Вы успешно зарегистрировались!",
-        'login_code_sent': "✅ Код отправлен!\n\n🔐 Ваш код подтверждения: <b>{}</b>\n\nВведите код:",
-        'login_enter_code': "🔐 Введите код подтверждения:",
-        'admin_login_success': "✅ Вы успешно вошли как администратор!"
-    },
-    'en': {
-        'welcome': "👋 Welcome!\n\nPlease choose your language:",
-        'send_phone': "📱 Send your phone number:",
-        'send_password': "🔐 Enter your password:",
-        'login_success': "✅ Welcome!\n\nYou have successfully logged in.",
-        'login_failed': "❌ Error!\n\nInvalid phone number or password.\n\nPlease try again.",
-        'connection_error': "⚠️ Server connection error!\n\nPlease try again later.",
-        'main_menu': "📋 Main Menu\n\nSelect a section:",
-        'profile': "👤 Profile",
-        'change_phone': "📱 Change phone",
-        'contact_admin': "📨 Contact admin",
-        'settings': "⚙️ Settings",
-        'back': "🔙 Back",
-        'enter_new_phone': "📱 Enter new phone number:",
-        'phone_updated': "✅ Number updated!\n\nYour new number has been saved.",
-        'enter_appeal_title': "📝 Enter appeal title:\n\n💡 Short and clear",
-        'enter_appeal_desc': "📄 Enter appeal text:\n\n💡 Describe in detail",
-        'appeal_sent': "✅ Sent!\n\nYour appeal has been delivered to admin.\nWe'll respond soon.",
-        'cancel': "❌ Cancel",
-        'choose_lang': "🌐 Choose language",
-        'logout': "🚪 Logout",
-        'uz': "🇺🇿 O'zbekcha",
-        'ru': "🇷🇺 Русский",
-        'en': "🇬🇧 English",
-        'user_info': "👤 Profile Information\n\n📱 Phone: {}\n🌐 Language: {}\n📅 Date: {}",
-        'invalid_phone': "❌ Invalid format!\n\nPlease enter correct phone number.",
-        'welcome_back': "👋 Welcome back, {}!\n\nYou're already logged in.",
-        'logout_success': "✅ You have successfully logged out.\n\nPress /start to login again.",
-        'language_changed': "Language successfully changed!",
-        'forgot_password': "🔑 Reset password",
-        'forgot_password_phone': "📱 Enter your phone number to reset password:",
-        'forgot_password_code_sent': "✅ Code sent!\n\n🔐 Your verification code: <b>{}</b>\n\nEnter the code:",
-        'forgot_password_enter_code': "🔐 Enter verification code:",
-        'forgot_password_code_verified': "✅ Code verified!\n\nEnter your new password (minimum 6 characters):",
-        'forgot_password_enter_new': "🔑 Enter new password (minimum 6 characters):",
-        'forgot_password_success': "✅ Password successfully changed!\n\nYou can now login with your new password.",
-        'forgot_password_error': "❌ Error: {}",
-        'invalid_code': "❌ Invalid code!\n\nPlease try again.",
-        'password_too_short': "❌ Password must be at least 6 characters!",
-        'send_phone_contact': "📱 Send phone number",
-        'forgot_password_welcome': "🔑 Reset password\n\nSend your phone number to reset password:",
-        'main_choice': "🔐 Select a section:",
-        'login': "🔐 Login",
-        'get_code': "📱 Get code",
-        'get_code_menu': "📱 Get code\n\nSelect a section:",
-        'get_code_login': "🔐 Code for login",
-        'get_code_register': "📝 Code for register",
-        'get_code_forgot': "🔑 Code for reset password",
-        'register_phone': "📝 Send your phone number for registration:",
-        'register_code_sent': "✅ Code sent!\n\n🔐 Your verification code: <b>{}</b>\n\nEnter the code:",
-        'register_enter_code': "🔐 Enter verification code:",
-        'register_enter_data': "📝 Registration data\n\nEnter in the following format:\n\n<b>Name|Password|Role</b>\n\nExample:\n<b>John Doe|password123|user</b>",
-        'register_success': "✅ You have successfully registered!",
-        'login_code_sent': "✅ Code sent!\n\n🔐 Your verification code: <b>{}</b>\n\nEnter the code:",
-        'login_enter_code': "🔐 Enter verification code:",
-        'admin_login_success': "✅ You have successfully logged in as admin!"
-    }
-}
+async def bind_session(phone, chat_id):
+    """Session'ni saqlash (diskka yozadigan store bo'lsa DB writer thread'da)"""
+    if user_sessions.blocking:
+        return await user_repo.run_write(user_sessions.bind, phone, chat_id)
+    return user_sessions.bind(phone, chat_id)
 
-def get_text(lang, key):
-    """Tarjima olish"""
-    return TRANSLATIONS.get(lang, TRANSLATIONS['uz']).get(key, key)
-
-def get_lang_keyboard():
-    """Modern til tanlash klaviaturasi"""
-    keyboard = [
-        [KeyboardButton("🇺🇿 O'zbekcha")],
-        [KeyboardButton("🇷🇺 Русский")],
-        [KeyboardButton("🇬🇧 English")]
-    ]
-    return ReplyKeyboardMarkup(keyboard, resize_keyboard=True, one_time_keyboard=True)
-
-def get_main_menu_keyboard(lang):
-    """Modern asosiy menyu"""
-    keyboard = [
-        [KeyboardButton(get_text(lang, 'profile')), KeyboardButton(get_text(lang, 'contact_admin'))],
-        [KeyboardButton(get_text(lang, 'change_phone')), KeyboardButton(get_text(lang, 'forgot_password'))],
-        [KeyboardButton(get_text(lang, 'settings')), KeyboardButton(get_text(lang, 'logout'))]
-    ]
-    return ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
-
-def get_back_keyboard(lang):
-    """Orqaga tugmasi"""
-    keyboard = [[KeyboardButton(get_text(lang, 'back'))]]
-    return ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
-
-def get_phone_contact_keyboard(lang):
-    """Telefon raqamni yuborish tugmasi"""
-    keyboard = [
-        [KeyboardButton(get_text(lang, 'send_phone_contact'), request_contact=True)],
-        [KeyboardButton(get_text(lang, 'back'))]
-    ]
-    return ReplyKeyboardMarkup(keyboard, resize_keyboard=True, one_time_keyboard=True)
-
-def get_main_choice_keyboard(lang):
-    """Asosiy tanlov tugmalari"""
-    keyboard = [
-        [KeyboardButton(get_text(lang, 'login'))],
-        [KeyboardButton(get_text(lang, 'get_code'))]
-    ]
-    return ReplyKeyboardMarkup(keyboard, resize_keyboard=True, one_time_keyboard=True)
-
-def get_code_menu_keyboard(lang):
-    """Kod olish menyusi tugmalari"""
-    keyboard = [
-        [KeyboardButton(get_text(lang, 'get_code_login'))],
-        [KeyboardButton(get_text(lang, 'get_code_register'))],
-        [KeyboardButton(get_text(lang, 'get_code_forgot'))],
-        [KeyboardButton(get_text(lang, 'back'))]
-    ]
-    return ReplyKeyboardMarkup(keyboard, resize_keyboard=True, one_time_keyboard=True)
+async def resolve_session(phone):
+    """Telefon raqam bo'yicha chat_id ni topish"""
+    if user_sessions.blocking:
+        chat_id = await user_repo.run_read(user_sessions.lookup, phone)
+        user_sessions.record_lookup(chat_id)
+        return chat_id
+    return user_sessions.resolve(phone)
+
+async def session_stats():
+    """Session metrikalari (SQLite store'da COUNT(*) reader thread'da)"""
+    if user_sessions.blocking:
+        return await user_repo.run_read(user_sessions.stats)
+    return user_sessions.stats()
 
 def validate_phone(phone):
     """Telefon raqam formatini tekshirish"""
@@ -464,10 +237,10 @@ def get_profile_message(user_data, lang):
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Start komandasi - Database dan foydalanuvchi ma'lumotlarini tekshiradi"""
     user = update.effective_user
-    logger.info(f"User {user.id} started bot")
+    logger.info("User %s started bot", user.id)
 
     # Database dan foydalanuvchini tekshiramiz
-    db_user = get_user(user.id)
+    db_user = await user_repo.get_user(user.id)
     
     if db_user and db_user.get('logged_in'):
         # Foydalanuvchi allaqachon login qilgan
@@ -491,7 +264,7 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     context.user_data.clear()  # Eski ma'lumotlarni tozalash
     
     await update.message.reply_text(
-        f"👋 Assalomu aleykum, {user.first_name}!\n\n" + TRANSLATIONS['uz']['welcome'],
+        f"👋 Assalomu aleykum, {user.first_name}!\n\n" + get_text('uz', 'welcome'),
         reply_markup=get_lang_keyboard()
     )
     return LANG_SELECT
@@ -500,17 +273,10 @@ async def lang_select(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Til tanlash (faqat yangi foydalanuvchilar uchun)"""
     text = update.message.text
     
-    if "O'zbekcha" in text or "🇺🇿" in text:
-        context.user_data['lang'] = 'uz'
-    elif "Русский" in text or "🇷🇺" in text:
-        context.user_data['lang'] = 'ru'
-    elif "English" in text or "🇬🇧" in text:
-        context.user_data['lang'] = 'en'
-    else:
-        context.user_data['lang'] = 'uz'
+    context.user_data['lang'] = route(MENU_LANG, text) or 'uz'
     
     lang = context.user_data['lang']
-    logger.info(f"User {update.effective_user.id} selected language: {lang}")
+    logger.info("User %s selected language: %s", update.effective_user.id, lang)
     
     await update.message.reply_text(
         get_text(lang, 'main_choice'),
@@ -524,7 +290,7 @@ async def main_choice_handler(update: Update, context: ContextTypes.DEFAULT_TYPE
     lang = context.user_data.get('lang', 'uz')
     
     # "Kirish" yoki "Kodni olish" - ikkalasi ham bir xil (kod so'rash)
-    if get_text(lang, 'login') in text or get_text(lang, 'get_code') in text or "🔐" in text or "📱" in text:
+    if route(MENU_MAIN_CHOICE, text, lang) == 'request_code':
         # Telefon raqam so'rash
         await update.message.reply_text(
             get_text(lang, 'send_phone'),
@@ -543,13 +309,15 @@ async def get_code_menu_handler(update: Update, context: ContextTypes.DEFAULT_TY
     text = update.message.text
     lang = context.user_data.get('lang', 'uz')
     
-    if get_text(lang, 'back') in text or "🔙" in text:
+    action = route(MENU_CODE, text, lang)
+    
+    if action == 'back':
         await update.message.reply_text(
             get_text(lang, 'main_choice'),
             reply_markup=get_main_choice_keyboard(lang)
         )
         return MAIN_CHOICE
-    elif get_text(lang, 'get_code_login') in text or ("🔐" in text and "Kirish" in text):
+    elif action == 'login':
         # Login uchun kod
         context.user_data['code_action'] = 'login'
         await update.message.reply_text(
@@ -557,7 +325,7 @@ async def get_code_menu_handler(update: Update, context: ContextTypes.DEFAULT_TY
             reply_markup=get_phone_contact_keyboard(lang)
         )
         return CODE_PHONE
-    elif get_text(lang, 'get_code_register') in text or ("📝" in text and "Ro'yxatdan" in text):
+    elif action == 'register':
         # Register uchun kod
         context.user_data['code_action'] = 'register'
         await update.message.reply_text(
@@ -565,7 +333,7 @@ async def get_code_menu_handler(update: Update, context: ContextTypes.DEFAULT_TY
             reply_markup=get_phone_contact_keyboard(lang)
         )
         return CODE_PHONE
-    elif get_text(lang, 'get_code_forgot') in text or ("🔑" in text and "Parolni" in text):
+    elif action == 'forgot':
         # Forgot password uchun kod
         context.user_data['code_action'] = 'forgot'
         await update.message.reply_text(
@@ -589,7 +357,7 @@ async def code_phone_handler(update: Update, context: ContextTypes.DEFAULT_TYPE)
     if not update.message.contact:
         text = update.message.text
         
-        if get_text(lang, 'back') in text or "🔙" in text:
+        if is_back(text, lang):
             # Orqaga - asosiy menyuga qaytish
             await update.message.reply_text(
                 get_text(lang, 'main_choice'),
@@ -605,7 +373,7 @@ async def code_phone_handler(update: Update, context: ContextTypes.DEFAULT_TYPE)
     
     # Contact yuborilgan
     phone = update.message.contact.phone_number
-    logger.info(f"User {user_id} sent contact: {phone}")
+    logger.info("User %s sent contact: %s", user_id, phone)
     
     # Telefon raqamni normalize qilish
     if not phone.startswith('+'):
@@ -620,31 +388,14 @@ async def code_phone_handler(update: Update, context: ContextTypes.DEFAULT_TYPE)
     
     # User session'ni saqlash (phone -> chat_id)
     chat_id = update.effective_chat.id
-    user_sessions[phone] = chat_id
-    # Telefon raqamni turli formatlarda saqlash
-    phone_clean = phone.replace(' ', '').replace('-', '')
-    user_sessions[phone_clean] = chat_id
-    logger.info(f"User session saved: {phone} -> {chat_id}")
+    session_key = await bind_session(phone, chat_id)
+    logger.info("User session saved: %s -> %s", session_key, chat_id)
     
-    # Backend'ga kod so'rash (POST /api/auth/send-code)
+    # Backend'ga kod so'rash (POST /api/auth/send-code), trace_id backend'ga ham boradi
     try:
-        send_code_url = get_backend_url("auth/send-code")
-        payload = {
-            'phoneNumber': phone
-        }
-        
-        logger.info(f"Sending request to: {send_code_url}")
-        logger.info(f"Payload: {payload}")
-        
-        response = requests.post(
-            send_code_url,
-            json=payload,
-            headers={'Content-Type': 'application/json'},
-            timeout=10
-        )
-        
-        logger.info(f"Response status: {response.status_code}")
-        logger.info(f"Response body: {response.text[:500]}")
+        trace_id = otp_tracker.start(phone)
+        response = await backend.send_code(phone, correlation_id=trace_id)
+        otp_tracker.backend_acked(trace_id)
         
         if response.status_code == 200:
             result = safe_json_parse(response)
@@ -700,28 +451,11 @@ async def login_password_handler(update: Update, context: ContextTypes.DEFAULT_T
     user_id = update.effective_user.id
     
     context.user_data['password'] = password
-    logger.info(f"User {user_id} attempting login with phone: {phone}")
+    logger.info("User %s attempting login with phone: %s", user_id, phone)
     
     # Backend'ga to'g'ridan-to'g'ri login qilish (parol bilan)
     try:
-        login_url = get_backend_url("auth/login")
-        payload = {
-            'phoneNumber': phone,
-            'password': password
-        }
-        
-        logger.info(f"Sending request to: {login_url}")
-        logger.info(f"Payload: {{'phoneNumber': '{phone}', 'password': '***'}}")
-        
-        response = requests.post(
-            login_url,
-            json=payload,
-            headers={'Content-Type': 'application/json'},
-            timeout=10
-        )
-        
-        logger.info(f"Response status: {response.status_code}")
-        logger.info(f"Response body: {response.text[:500]}")
+        response = await backend.login(phone, password)
         
         if response.status_code == 200:
             result = safe_json_parse(response)
@@ -749,10 +483,10 @@ async def login_password_handler(update: Update, context: ContextTypes.DEFAULT_T
                 }
                 
                 # Database ga saqlash
-                save_user(user_data)
+                await user_repo.save_user(user_data)
                 context.user_data.update(user_data)
                 
-                logger.info(f"User {user_id} logged in successfully as {data.get('fullName')}")
+                logger.info("User %s logged in successfully as %s", user_id, data.get('fullName'))
                 
                 # Profil ma'lumotlarini tayyorlash
                 profile_msg = get_profile_message(user_data, lang)
@@ -801,7 +535,7 @@ async def code_verify_handler(update: Update, context: ContextTypes.DEFAULT_TYPE
     lang = context.user_data.get('lang', 'uz')
     user_id = update.effective_user.id
     
-    if get_text(lang, 'back') in text or "🔙" in text:
+    if is_back(text, lang):
         await update.message.reply_text(
             get_text(lang, 'main_choice'),
             reply_markup=get_main_choice_keyboard(lang)
@@ -810,7 +544,7 @@ async def code_verify_handler(update: Update, context: ContextTypes.DEFAULT_TYPE
     
     # Kodni kiritganda, faqat asosiy menyuga qaytish (verify qilmaydi)
     code = text.strip()
-    logger.info(f"User {user_id} entered code: {code} (not verifying, returning to main menu)")
+    logger.info("User %s entered code: %s (not verifying, returning to main menu)", user_id, code)
     
     await update.message.reply_text(
         get_text(lang, 'main_choice'),
@@ -826,7 +560,7 @@ async def register_phone_handler(update: Update, context: ContextTypes.DEFAULT_T
     if not update.message.contact:
         text = update.message.text
         
-        if get_text(lang, 'back') in text or "🔙" in text:
+        if is_back(text, lang):
             await update.message.reply_text(
                 get_text(lang, 'login_or_reset'),
                 reply_markup=get_login_or_reset_keyboard(lang)
@@ -841,7 +575,7 @@ async def register_phone_handler(update: Update, context: ContextTypes.DEFAULT_T
     
     # Contact yuborilgan
     phone = update.message.contact.phone_number
-    logger.info(f"User {update.effective_user.id} sent contact for register: {phone}")
+    logger.info("User %s sent contact for register: %s", update.effective_user.id, phone)
     
     # Telefon raqamni normalize qilish
     if not phone.startswith('+'):
@@ -856,24 +590,7 @@ async def register_phone_handler(update: Update, context: ContextTypes.DEFAULT_T
     
     # Backend'ga kod so'rash
     try:
-        send_code_url = get_backend_url("auth/send-register-code")
-        payload = {
-            'phoneNumber': phone,
-            'source': 'register'
-        }
-        
-        logger.info(f"Sending request to: {send_code_url}")
-        logger.info(f"Payload: {payload}")
-        
-        response = requests.post(
-            send_code_url,
-            json=payload,
-            headers={'Content-Type': 'application/json'},
-            timeout=10
-        )
-        
-        logger.info(f"Response status: {response.status_code}")
-        logger.info(f"Response body: {response.text[:500]}")
+        response = await backend.send_register_code(phone)
         
         if response.status_code == 200:
             result = safe_json_parse(response)
@@ -933,7 +650,7 @@ async def register_code_handler(update: Update, context: ContextTypes.DEFAULT_TY
     text = update.message.text
     lang = context.user_data.get('lang', 'uz')
     
-    if get_text(lang, 'back') in text or "🔙" in text:
+    if is_back(text, lang):
         await update.message.reply_text(
             get_text(lang, 'register_phone'),
             reply_markup=get_phone_contact_keyboard(lang)
@@ -958,7 +675,7 @@ async def register_data_handler(update: Update, context: ContextTypes.DEFAULT_TY
     phone = context.user_data.get('phone')
     code = context.user_data.get('verified_code')
     
-    if get_text(lang, 'back') in text or "🔙" in text:
+    if is_back(text, lang):
         await update.message.reply_text(
             get_text(lang, 'register_enter_code'),
             reply_markup=get_back_keyboard(lang)
@@ -989,27 +706,7 @@ async def register_data_handler(update: Update, context: ContextTypes.DEFAULT_TY
     
     # Backend'ga register qilish
     try:
-        register_url = get_backend_url("auth/register")
-        payload = {
-            'fullName': full_name,
-            'phoneNumber': phone,
-            'password': password,
-            'role': role,
-            'code': code
-        }
-        
-        logger.info(f"Sending request to: {register_url}")
-        logger.info(f"Payload: {{'fullName': '{full_name}', 'phoneNumber': '{phone}', 'role': '{role}', 'code': '{code}'}}")
-        
-        response = requests.post(
-            register_url,
-            json=payload,
-            headers={'Content-Type': 'application/json'},
-            timeout=10
-        )
-        
-        logger.info(f"Response status: {response.status_code}")
-        logger.info(f"Response body: {response.text[:500]}")
+        response = await backend.register(full_name, phone, password, role, code)
         
         if response.status_code == 200 or response.status_code == 201:
             result = safe_json_parse(response)
@@ -1037,10 +734,10 @@ async def register_data_handler(update: Update, context: ContextTypes.DEFAULT_TY
                 }
                 
                 # Database ga saqlash
-                save_user(user_data)
+                await user_repo.save_user(user_data)
                 context.user_data.update(user_data)
                 
-                logger.info(f"User {user_id} registered successfully as {full_name}")
+                logger.info("User %s registered successfully as %s", user_id, full_name)
                 
                 # Profil ma'lumotlarini tayyorlash
                 profile_msg = get_profile_message(user_data, lang)
@@ -1088,12 +785,14 @@ async def main_menu_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     lang = context.user_data.get('lang', 'uz')
     
     # Database dan yangi ma'lumotlarni olish
-    db_user = get_user(user_id)
+    db_user = await user_repo.get_user(user_id)
     if db_user:
         context.user_data.update(db_user)
         lang = db_user.get('lang', lang)  # Yangi tilni olish
     
-    if get_text(lang, 'profile') in text or "👤" in text:
+    action = route(MENU_MAIN, text, lang)
+    
+    if action == 'profile':
         profile_msg = get_profile_message(context.user_data, lang)
         
         await update.message.reply_text(
@@ -1102,21 +801,21 @@ async def main_menu_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
         return MAIN_MENU
     
-    elif get_text(lang, 'change_phone') in text or "📱" in text:
+    elif action == 'change_phone':
         await update.message.reply_text(
             get_text(lang, 'enter_new_phone'),
             reply_markup=get_back_keyboard(lang)
         )
         return CHANGE_PHONE
     
-    elif get_text(lang, 'contact_admin') in text or "📨" in text:
+    elif action == 'contact_admin':
         await update.message.reply_text(
             get_text(lang, 'enter_appeal_title'),
             reply_markup=get_back_keyboard(lang)
         )
         return APPEAL_TITLE
     
-    elif get_text(lang, 'forgot_password') in text or "🔑" in text:
+    elif action == 'forgot_password':
         # Parolni tiklash - Faqat contact orqali telefon raqam olish
         await update.message.reply_text(
             get_text(lang, 'forgot_password_welcome'),
@@ -1124,7 +823,7 @@ async def main_menu_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
         return FORGOT_PASSWORD_CONTACT
     
-    elif get_text(lang, 'settings') in text or "⚙️" in text:
+    elif action == 'settings':
         # SOZLAMALAR: Faqat til tanlash menyusini ko'rsatamiz
         await update.message.reply_text(
             get_text(lang, 'choose_lang'),
@@ -1132,9 +831,9 @@ async def main_menu_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
         return MAIN_MENU  # ⚠️ MUHIM: MAIN_MENU ni saqlaymiz
     
-    elif get_text(lang, 'logout') in text or "🚪" in text:
+    elif action == 'logout':
         # Logout qilish
-        logout_user(user_id)
+        await user_repo.logout_user(user_id)
         context.user_data.clear()
         
         await update.message.reply_text(
@@ -1144,7 +843,7 @@ async def main_menu_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return ConversationHandler.END
     
     # Agar til tanlash tugmalaridan birini bossa (sozlamalar ichida)
-    elif any(lang_text in text for lang_text in ["O'zbekcha", "Русский", "English", "🇺🇿", "🇷🇺", "🇬🇧"]):
+    elif action and action.startswith('lang:'):
         return await language_change_handler(update, context)
     
     return MAIN_MENU
@@ -1155,31 +854,23 @@ async def language_change_handler(update: Update, context: ContextTypes.DEFAULT_
     text = update.message.text
     
     # Database dan foydalanuvchini tekshiramiz
-    db_user = get_user(user_id)
+    db_user = await user_repo.get_user(user_id)
     if not db_user or not db_user.get('logged_in'):
         # Agar login qilmagan bo'lsa, boshidan boshlaymiz
         await update.message.reply_text(
-            TRANSLATIONS['uz']['welcome'],
+            get_text('uz', 'welcome'),
             reply_markup=get_lang_keyboard()
         )
         return LANG_SELECT
     
     # Yangi tilni tanlash
-    if "O'zbekcha" in text or "🇺🇿" in text:
-        new_lang = 'uz'
-    elif "Русский" in text or "🇷🇺" in text:
-        new_lang = 'ru'
-    elif "English" in text or "🇬🇧" in text:
-        new_lang = 'en'
-    else:
-        new_lang = 'uz'
+    new_lang = route(MENU_LANG, text) or 'uz'
     
-    # Database yangilash
-    db_user['lang'] = new_lang
-    save_user(db_user)
+    # Database yangilash (faqat lang ustuni)
+    await user_repo.set_lang(user_id, new_lang)
     context.user_data['lang'] = new_lang
     
-    logger.info(f"User {user_id} changed language to: {new_lang}")
+    logger.info("User %s changed language to: %s", user_id, new_lang)
     
     # Asosiy menyuga qaytish
     await update.message.reply_text(
@@ -1195,7 +886,7 @@ async def change_phone_handler(update: Update, context: ContextTypes.DEFAULT_TYP
     user_id = update.effective_user.id
     lang = context.user_data.get('lang', 'uz')
     
-    if get_text(lang, 'back') in text or "🔙" in text:
+    if is_back(text, lang):
         await update.message.reply_text(
             get_text(lang, 'login_or_reset'),
             reply_markup=get_login_or_reset_keyboard(lang)
@@ -1221,13 +912,12 @@ async def change_phone_handler(update: Update, context: ContextTypes.DEFAULT_TYP
             phone = '+998' + phone
     
     # Database yangilash
-    db_user = get_user(user_id)
+    db_user = await user_repo.get_user(user_id)
     if db_user:
-        db_user['phone'] = phone
-        save_user(db_user)
+        await user_repo.set_phone(user_id, phone)
         context.user_data['phone'] = phone
     
-    logger.info(f"User {user_id} changed phone to: {phone}")
+    logger.info("User %s changed phone to: %s", user_id, phone)
     
     await update.message.reply_text(
         get_text(lang, 'phone_updated'),
@@ -1240,7 +930,7 @@ async def appeal_title_handler(update: Update, context: ContextTypes.DEFAULT_TYP
     text = update.message.text
     lang = context.user_data.get('lang', 'uz')
     
-    if get_text(lang, 'back') in text or "🔙" in text:
+    if is_back(text, lang):
         await update.message.reply_text(
             get_text(lang, 'login_or_reset'),
             reply_markup=get_login_or_reset_keyboard(lang)
@@ -1260,7 +950,7 @@ async def appeal_desc_handler(update: Update, context: ContextTypes.DEFAULT_TYPE
     user_id = update.effective_user.id
     lang = context.user_data.get('lang', 'uz')
     
-    if get_text(lang, 'back') in text or "🔙" in text:
+    if is_back(text, lang):
         await update.message.reply_text(
             get_text(lang, 'login_or_reset'),
             reply_markup=get_login_or_reset_keyboard(lang)
@@ -1268,7 +958,7 @@ async def appeal_desc_handler(update: Update, context: ContextTypes.DEFAULT_TYPE
         return LOGIN_OR_RESET
     
     # Database dan yangi ma'lumotlarni olish
-    db_user = get_user(user_id)
+    db_user = await user_repo.get_user(user_id)
     if db_user:
         context.user_data.update(db_user)
     
@@ -1302,9 +992,9 @@ async def appeal_desc_handler(update: Update, context: ContextTypes.DEFAULT_TYPE
     """
     
     try:
-        group_id = int(ADMIN_GROUP_ID)
-        await context.bot.send_message(chat_id=group_id, text=message, parse_mode='HTML')
-        logger.info(f"✅ Appeal sent to admin group {group_id} from user {user.id}")
+        group_id = int(settings.admin_group_id)
+        await context.bot.send_message(chat_id=group_id, text=message, parse_mode='HTML', rate_limit_args=PRIORITY_ADMIN)
+        logger.info("✅ Appeal sent to admin group %s from user %s", group_id, user.id)
         
         await update.message.reply_text(
             get_text(lang, 'appeal_sent'),
@@ -1328,7 +1018,7 @@ async def forgot_password_contact_handler(update: Update, context: ContextTypes.
         # Agar contact emas, text bo'lsa
         text = update.message.text
         
-        if get_text(lang, 'back') in text or "🔙" in text:
+        if is_back(text, lang):
             await update.message.reply_text(
                 get_text(lang, 'main_menu'),
                 reply_markup=get_main_menu_keyboard(lang)
@@ -1344,7 +1034,7 @@ async def forgot_password_contact_handler(update: Update, context: ContextTypes.
     
     # Contact yuborilgan
     phone = update.message.contact.phone_number
-    logger.info(f"User {update.effective_user.id} sent contact: {phone}")
+    logger.info("User %s sent contact: %s", update.effective_user.id, phone)
     
     # Telefon raqamni normalize qilish
     if not phone.startswith('+'):
@@ -1356,12 +1046,12 @@ async def forgot_password_contact_handler(update: Update, context: ContextTypes.
             phone = '+998' + phone
     
     context.user_data['forgot_password_phone'] = phone
-    logger.info(f"User {update.effective_user.id} requested password reset for phone: {phone}")
+    logger.info("User %s requested password reset for phone: %s", update.effective_user.id, phone)
     
     # Backend'dan kod olish
     try:
         # Backend URL ni tekshirish
-        if not BACKEND_URL:
+        if not settings.backend_url:
             logger.error("BACKEND_URL topilmadi! .env faylni tekshiring!")
             await update.message.reply_text(
                 get_text(lang, 'connection_error'),
@@ -1369,24 +1059,7 @@ async def forgot_password_contact_handler(update: Update, context: ContextTypes.
             )
             return FORGOT_PASSWORD_CONTACT
         
-        forgot_password_url = get_backend_url("auth/forgot-password")
-        payload = {
-            'phoneNumber': phone,
-            'source': 'bot'  # Bot'dan kelgan so'rov
-        }
-        
-        logger.info(f"Sending request to: {forgot_password_url}")
-        logger.info(f"Payload: {payload}")
-        
-        response = requests.post(
-            forgot_password_url,
-            json=payload,
-            headers={'Content-Type': 'application/json'},
-            timeout=10
-        )
-        
-        logger.info(f"Response status: {response.status_code}")
-        logger.info(f"Response body: {response.text}")
+        response = await backend.forgot_password(phone)
         
         if response.status_code == 200:
             result = safe_json_parse(response)
@@ -1455,7 +1128,7 @@ async def forgot_password_phone_handler(update: Update, context: ContextTypes.DE
     text = update.message.text
     lang = context.user_data.get('lang', 'uz')
     
-    if get_text(lang, 'back') in text or "🔙" in text:
+    if is_back(text, lang):
         await update.message.reply_text(
             get_text(lang, 'login_or_reset'),
             reply_markup=get_login_or_reset_keyboard(lang)
@@ -1481,28 +1154,11 @@ async def forgot_password_phone_handler(update: Update, context: ContextTypes.DE
             phone = '+998' + phone
     
     context.user_data['forgot_password_phone'] = phone
-    logger.info(f"User {update.effective_user.id} requested password reset for phone: {phone}")
+    logger.info("User %s requested password reset for phone: %s", update.effective_user.id, phone)
     
     # Backend'dan kod olish
     try:
-        forgot_password_url = get_backend_url("auth/forgot-password")
-        payload = {
-            'phoneNumber': phone,
-            'source': 'bot'  # Bot'dan kelgan so'rov
-        }
-        
-        logger.info(f"Sending request to: {forgot_password_url}")
-        logger.info(f"Payload: {payload}")
-        
-        response = requests.post(
-            forgot_password_url,
-            json=payload,
-            headers={'Content-Type': 'application/json'},
-            timeout=10
-        )
-        
-        logger.info(f"Response status: {response.status_code}")
-        logger.info(f"Response body: {response.text}")
+        response = await backend.forgot_password(phone)
         
         if response.status_code == 200:
             result = safe_json_parse(response)
@@ -1572,7 +1228,7 @@ async def forgot_password_code_handler(update: Update, context: ContextTypes.DEF
     lang = context.user_data.get('lang', 'uz')
     phone = context.user_data.get('forgot_password_phone')
     
-    if get_text(lang, 'back') in text or "🔙" in text:
+    if is_back(text, lang):
         await update.message.reply_text(
             get_text(lang, 'login_or_reset'),
             reply_markup=get_login_or_reset_keyboard(lang)
@@ -1580,28 +1236,11 @@ async def forgot_password_code_handler(update: Update, context: ContextTypes.DEF
         return LOGIN_OR_RESET
     
     code = text.strip()
-    logger.info(f"User {update.effective_user.id} verifying code: {code} for phone: {phone}")
+    logger.info("User %s verifying code: %s for phone: %s", update.effective_user.id, code, phone)
     
     # Backend'da kodni tekshirish
     try:
-        verify_code_url = get_backend_url("auth/verify-code")
-        payload = {
-            'phoneNumber': phone,
-            'code': code
-        }
-        
-        logger.info(f"Sending request to: {verify_code_url}")
-        logger.info(f"Payload: {payload}")
-        
-        response = requests.post(
-            verify_code_url,
-            json=payload,
-            headers={'Content-Type': 'application/json'},
-            timeout=10
-        )
-        
-        logger.info(f"Response status: {response.status_code}")
-        logger.info(f"Response body: {response.text}")
+        response = await backend.verify_code(phone, code)
         
         if response.status_code == 200:
             result = safe_json_parse(response)
@@ -1670,7 +1309,7 @@ async def forgot_password_new_password_handler(update: Update, context: ContextT
     code = context.user_data.get('code')
     reset_token = context.user_data.get('reset_token')
     
-    if get_text(lang, 'back') in text or "🔙" in text:
+    if is_back(text, lang):
         await update.message.reply_text(
             get_text(lang, 'get_code_menu'),
             reply_markup=get_code_menu_keyboard(lang)
@@ -1691,24 +1330,7 @@ async def forgot_password_new_password_handler(update: Update, context: ContextT
     
     # Backend'da parolni tiklash
     try:
-        reset_password_url = get_backend_url("auth/reset-password")
-        payload = {
-            'resetToken': reset_token,
-            'newPassword': new_password
-        }
-        
-        logger.info(f"Sending request to: {reset_password_url}")
-        logger.info(f"Payload: {{'resetToken': '***', 'newPassword': '***'}}")
-        
-        response = requests.post(
-            reset_password_url,
-            json=payload,
-            headers={'Content-Type': 'application/json'},
-            timeout=10
-        )
-        
-        logger.info(f"Response status: {response.status_code}")
-        logger.info(f"Response body: {response.text}")
+        response = await backend.reset_password(reset_token, new_password)
         
         if response.status_code == 200:
             result = safe_json_parse(response)
@@ -1777,7 +1399,7 @@ async def cancel(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def logout_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Logout komandasi"""
     user_id = update.effective_user.id
-    logout_user(user_id)
+    await user_repo.logout_user(user_id)
     context.user_data.clear()
     
     await update.message.reply_text(
@@ -1786,126 +1408,261 @@ async def logout_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     )
     return ConversationHandler.END
 
-# Flask Webhook Handler - Backend'dan kod kelganda
-@flask_app.route('/webhook/code', methods=['POST', 'GET'])
-def receive_code_webhook():
+# Webhook Handler - Backend'dan kod kelganda (bot bilan bitta event loop'da)
+@webhook_routes.get('/webhook/code')
+async def webhook_status(request: web.Request):
+    """Webhook holati - test uchun"""
+    return web.json_response({
+        "status": "ok",
+        "message": "Webhook server ishlamoqda",
+        "http_pools": http_pool.pool_stats(),
+        "otp_queue": otp_queue.stats(),
+        "outbound": outbound_scheduler.stats(),
+        "updates": telegram_application.update_processor.stats(),
+        "user_cache": user_repo.cache_stats(),
+        "user_writes": user_repo.write_stats(),
+        "persistence": bot_persistence.stats(),
+        "user_sessions": await session_stats(),
+        "otp_delivery": otp_tracker.report()
+    })
+
+@webhook_routes.get('/traces/otp')
+async def otp_traces(request: web.Request):
+    """OTP yetkazish percentillari va oxirgi span'lar (?trace_id=...&limit=...)"""
+    try:
+        limit = int(request.query.get('limit', '100'))
+    except ValueError:
+        limit = 100
+    return web.json_response({
+        "report": otp_tracker.report(),
+        "spans": otp_tracker.tracer.recent(limit=limit, trace_id=request.query.get('trace_id'))
+    })
+
+@webhook_routes.get('/metrics')
+async def metrics_endpoint(request: web.Request):
+    """Prometheus metrikalari"""
+    return web.Response(body=metrics.render().encode('utf-8'), headers={'Content-Type': metrics.CONTENT_TYPE})
+
+@webhook_routes.post('/webhook/code')
+async def receive_code_webhook(request: web.Request):
     """Backend'dan kod kelganda webhook"""
     try:
-        # GET request - test uchun
-        if request.method == 'GET':
-            return jsonify({
-                "status": "ok",
-                "message": "Webhook server ishlamoqda",
-                "user_sessions": len(user_sessions),
-                "sessions": user_sessions
-            }), 200
-        
-        # POST request - kod qabul qilish
-        data = request.json
+        try:
+            data = await request.json()
+        except ValueError:
+            data = None
         if not data:
             logger.warning("⚠️ Webhook'da data yo'q!")
-            return jsonify({"status": "error", "message": "Data yo'q"}), 400
+            WEBHOOK_REQUESTS.inc(result='bad_request')
+            return web.json_response({"status": "error", "message": "Data yo'q"}, status=400)
         
         phone_number = data.get('phoneNumber')
         code = data.get('code')
         
-        logger.info(f"📩 Webhook qabul qilindi: {phone_number} - {code}")
-        logger.info(f"📦 Webhook data: {data}")
-        logger.info(f"📋 User sessions: {user_sessions}")
+        logger.debug("📩 Webhook qabul qilindi: phone=%s code=%s data=%s", phone_number, code, data)
         
         if not phone_number:
             logger.warning("⚠️ phoneNumber yo'q!")
-            return jsonify({"status": "error", "message": "Telefon raqam kiritilmagan"}), 400
+            WEBHOOK_REQUESTS.inc(result='bad_request')
+            return web.json_response({"status": "error", "message": "Telefon raqam kiritilmagan"}, status=400)
+        
+        if not code:
+            logger.warning("⚠️ code yo'q!")
+            WEBHOOK_REQUESTS.inc(result='bad_request')
+            return web.json_response({"status": "error", "message": "Kod kiritilmagan"}, status=400)
         
         # Telefon raqamni normalize qilish (solishtirish uchun)
         normalized_webhook_phone = normalize_phone_for_comparison(phone_number)
-        logger.info(f"🔍 Normalized webhook phone: {normalized_webhook_phone}")
         
-        # User'ni topish (phone_number bo'yicha)
-        chat_id = None
-        for phone, chat in user_sessions.items():
-            normalized_session_phone = normalize_phone_for_comparison(phone)
-            logger.info(f"🔍 Comparing: {normalized_session_phone} with {normalized_webhook_phone}")
-            
-            # To'liq telefon raqamni solishtirish (faqat aniq mos kelganda)
-            if normalized_session_phone == normalized_webhook_phone:
-                chat_id = chat
-                logger.info(f"✅ User topildi: {phone} -> {chat_id}")
-                break
+        # User'ni topish - indeksdan bitta lookup
+        chat_id = await resolve_session(normalized_webhook_phone)
         
         if chat_id:
-            # Telegram Bot API'ga to'g'ridan-to'g'ri HTTP so'rov yuborish
-            try:
-                send_code_to_user_sync(chat_id, code, phone_number)
-                return jsonify({"status": "ok", "message": "Kod yuborildi"}), 200
-            except Exception as e:
-                logger.error(f"❌ Kod yuborish xatolik: {str(e)}")
-                return jsonify({"status": "error", "message": str(e)}), 500
+            # Backend correlation ID ni qaytarsa shuni, aks holda telefon bo'yicha trace
+            correlation_id = request.headers.get(CORRELATION_HEADER) or data.get('correlationId')
+            trace_id = otp_tracker.webhook_received(phone_number, correlation_id)
+            
+            # Navbatga qo'yib darhol javob qaytaramiz - yetkazishni worker'lar bajaradi
+            if not otp_queue.submit(chat_id, code, phone_number, trace_id=trace_id):
+                logger.warning(f"⚠️ OTP navbati to'la: {otp_queue.stats()}")
+                WEBHOOK_REQUESTS.inc(result='queue_full')
+                return web.json_response(
+                    {"status": "error", "message": "Navbat to'la, keyinroq urinib ko'ring"},
+                    status=429,
+                    headers={"Retry-After": "1"}
+                )
+            WEBHOOK_REQUESTS.inc(result='hit')
+            return web.json_response({"status": "accepted", "message": "Kod navbatga qo'yildi"}, status=202)
         else:
             logger.warning(f"⚠️ User topilmadi: {phone_number} (normalized: {normalized_webhook_phone})")
-            logger.info(f"📋 Mavjud session'lar: {list(user_sessions.keys())}")
-            return jsonify({
+            WEBHOOK_REQUESTS.inc(result='miss')
+            return web.json_response({
                 "status": "error", 
                 "message": f"User topilmadi: {phone_number}",
-                "normalized": normalized_webhook_phone,
-                "available_sessions": list(user_sessions.keys())
-            }), 404
+                "normalized": normalized_webhook_phone
+            }, status=404)
         
     except Exception as e:
-        logger.error(f"❌ Webhook xatolik: {str(e)}")
-        import traceback
-        logger.error(traceback.format_exc())
-        return jsonify({"status": "error", "message": str(e)}), 500
+        logger.exception(f"❌ Webhook xatolik: {str(e)}")
+        WEBHOOK_REQUESTS.inc(result='error')
+        return web.json_response({"status": "error", "message": str(e)}, status=500)
 
-def send_code_to_user_sync(chat_id: int, code: str, phone_number: str = None):
-    """Foydalanuvchiga kodni yuborish (sync, event loop muammosiz)"""
-    try:
-        if not BOT_TOKEN:
-            logger.error("❌ BOT_TOKEN topilmadi!")
-            return
-        
-        message = f"🔐 Sizning tasdiqlash kodingiz: <b>{code}</b>"
-        if phone_number:
-            message += f"\n\n📱 Telefon: {phone_number}"
-        
-        # Telegram Bot API'ga to'g'ridan-to'g'ri HTTP so'rov
-        url = f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage"
-        
-        # "Orqaga" tugmasi bilan yuborish
-        keyboard = {
-            "keyboard": [[{"text": "🔙 Orqaga"}]],
-            "resize_keyboard": True,
-            "one_time_keyboard": False
-        }
-        
-        payload = {
-            "chat_id": chat_id,
-            "text": message,
-            "parse_mode": "HTML",
-            "reply_markup": keyboard
-        }
-        
-        response = requests.post(url, json=payload, timeout=10)
-        
-        if response.status_code == 200:
-            logger.info(f"✅ Kod yuborildi: chat_id={chat_id}, code={code}, phone={phone_number}")
+async def send_code_to_user(chat_id: int, code: str, phone_number: str = None, trace_id: str = None):
+    """Foydalanuvchiga kodni yuborish (application.bot orqali)"""
+    otp_tracker.sending(trace_id)
+    message = f"🔐 Sizning tasdiqlash kodingiz: <b>{code}</b>"
+    if phone_number:
+        message += f"\n\n📱 Telefon: {phone_number}"
+    
+    # "Orqaga" tugmasi bilan yuborish
+    await telegram_application.bot.send_message(
+        chat_id=chat_id,
+        text=message,
+        parse_mode='HTML',
+        reply_markup=get_otp_back_keyboard(),
+        rate_limit_args=PRIORITY_OTP
+    )
+    otp_tracker.delivered(trace_id, chat_id=chat_id)
+    logger.info("✅ Kod yuborildi: chat_id=%s, phone=%s", chat_id, phone_number, extra={'trace_id': trace_id})
+
+async def sweep_sessions_periodically():
+    """Eskirgan session'larni vaqti-vaqti bilan tozalash"""
+    while True:
+        await asyncio.sleep(settings.session_sweep_interval)
+        if user_sessions.blocking:
+            expired = await user_repo.run_write(user_sessions.sweep)
         else:
-            logger.error(f"❌ Telegram API xatolik: {response.status_code} - {response.text}")
-            
-    except Exception as e:
-        logger.error(f"❌ Kod yuborish xatolik: {str(e)}")
-        import traceback
-        logger.error(traceback.format_exc())
+            expired = user_sessions.sweep()
+        if expired:
+            logger.info(f"🧹 {expired} ta eskirgan session tozalandi")
+        otp_tracker.sweep()
 
-def main():
-    """Botni ishga tushirish"""
-    global telegram_application
-    
-    if not BOT_TOKEN:
-        logger.error("BOT_TOKEN topilmadi! .env faylni tekshiring!")
-        return
-    
-    telegram_application = Application.builder().token(BOT_TOKEN).build()
+async def watch_translations():
+    """locales/ fayllari o'zgarsa tarjimalarni qayta yuklash"""
+    while True:
+        await asyncio.sleep(settings.i18n_reload_interval)
+        try:
+            changed = translation_catalog.changed_on_disk()
+        except OSError as e:
+            logger.warning(f"⚠️ locales/ tekshirib bo'lmadi: {e}")
+            continue
+        if changed:
+            reload_translations()
+
+def install_reload_signal():
+    """SIGHUP - tarjimalarni qayta yuklash (kill -HUP <pid>)"""
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, reload_translations)
+    except (AttributeError, NotImplementedError, RuntimeError):
+        # Windows'da SIGHUP yo'q
+        logger.info("ℹ️ SIGHUP qo'llab-quvvatlanmaydi, tarjimalar faqat polling orqali yangilanadi")
+
+async def start_background_tasks(application: Application):
+    """Bot ishga tushganda fon vazifalari, OTP worker'lari va webhook server'ni boshlash"""
+    background_tasks.append(asyncio.create_task(sweep_sessions_periodically()))
+    install_reload_signal()
+    if settings.i18n_reload_interval > 0:
+        background_tasks.append(asyncio.create_task(watch_translations()))
+    await otp_queue.start()
+    await webhook_server.start()
+
+async def stop_background_tasks(application: Application):
+    """Bot to'xtaganda (bot hali ishlayotganda) webhook'ni yopish va OTP navbatini bo'shatish"""
+    await webhook_server.stop()
+    await otp_queue.stop()
+    for task in background_tasks:
+        task.cancel()
+    background_tasks.clear()
+
+async def shutdown_clients(application: Application):
+    """Bot to'xtaganda HTTP klientlar va DB ulanishini yopish"""
+    await http_pool.close_all()
+    await user_repo.flush()
+    user_sessions.close()
+    bot_persistence.close()
+    user_repo.close()
+    otp_tracker.tracer.close()
+
+def create_app(app_settings: Settings = None) -> Application:
+    """Sozlamalar, DB, klientlar, webhook server va Application ni yaratish
+
+    bot.py ni import qilish hech qanday yon ta'sirga ega emas - fayllar, DB va
+    server faqat shu yerda ochiladi.
+    """
+    global settings, telegram_application, webhook_server, outbound_scheduler
+    global storage, user_repo, bot_persistence, user_sessions, otp_queue, otp_tracker, conversation_handler
+
+    settings = app_settings or load_settings()
+
+    # Tarjimalar tekshiruvi - yetishmayotgan kalitlar birinchi ishlatilganda emas, ishga tushishda ko'rinadi
+    configure_translations(settings.locales_dir)
+    validate_translations()
+
+    http_pool.configure(
+        max_connections=settings.http_max_connections,
+        max_keepalive=settings.http_max_keepalive,
+        keepalive_expiry=settings.http_keepalive_expiry,
+        timeout=settings.http_timeout,
+        http2=settings.http2
+    )
+
+    outbound_scheduler = OutboundScheduler(
+        global_rate=settings.telegram_global_rate,
+        private_rate=settings.telegram_chat_rate,
+        group_rate_per_minute=settings.telegram_group_rate_per_minute
+    )
+
+    # Har thread uchun bitta uzoq yashovchi ulanish (har so'rovda connect/close qilinmaydi)
+    storage = UserStorage(settings.db_file)
+    storage.init_db()
+    user_repo = UserRepository(
+        storage,
+        cache_size=settings.user_cache_size,
+        cache_ttl=settings.user_cache_ttl,
+        write_delay=settings.user_write_delay_ms / 1000,
+        write_batch_size=settings.user_write_batch_size
+    )
+    bot_persistence = SQLitePersistence(
+        settings.db_file,
+        user_repo,
+        update_interval=settings.persistence_update_interval,
+        flush_delay=settings.persistence_flush_delay
+    )
+    user_sessions = create_session_store(
+        settings.session_backend,
+        settings.db_file,
+        ttl=settings.otp_ttl_seconds,
+        maxsize=settings.session_max_size
+    )
+
+    otp_tracker = OTPTracker(
+        Tracer(capacity=settings.trace_buffer_size, export_path=settings.trace_file),
+        ttl=settings.otp_ttl_seconds,
+        maxsize=settings.session_max_size
+    )
+
+    # OTP yetkazish navbati - webhook darhol 202 qaytaradi, worker'lar yuboradi
+    otp_queue = OTPDeliveryQueue(
+        send_code_to_user,
+        workers=settings.otp_workers,
+        maxsize=settings.otp_queue_size,
+        max_retries=settings.otp_max_retries,
+        code_ttl=settings.otp_ttl_seconds
+    )
+
+    builder = (
+        Application.builder()
+        .token(settings.bot_token)
+        .rate_limiter(outbound_scheduler)
+        .persistence(bot_persistence)
+        .concurrent_updates(PerChatUpdateProcessor(settings.concurrent_updates))
+        .post_init(start_background_tasks)
+        .post_stop(stop_background_tasks)
+        .post_shutdown(shutdown_clients)
+    )
+    if settings.telegram_api_url:
+        builder = builder.base_url(settings.telegram_api_url)
+    telegram_application = builder.build()
     application = telegram_application
     
     conv_handler = ConversationHandler(
@@ -1927,23 +1684,56 @@ def main():
             FORGOT_PASSWORD_NEW_PASSWORD: [MessageHandler(filters.TEXT & ~filters.COMMAND, forgot_password_new_password_handler)],
         },
         fallbacks=[CommandHandler('cancel', cancel), CommandHandler('logout', logout_command)],
+        name='main_conversation',
+        persistent=True,
     )
     
+    # Har bir handler davomiyligi metrikalarga yoziladi
+    for handler in conv_handler.entry_points:
+        handler.callback = instrument_handler('entry', handler.callback)
+    for state, handlers in conv_handler.states.items():
+        for handler in handlers:
+            handler.callback = instrument_handler(STATE_NAMES[state], handler.callback)
+    for handler in conv_handler.fallbacks:
+        handler.callback = instrument_handler('fallback', handler.callback)
+    
+    conversation_handler = conv_handler
     application.add_handler(conv_handler)
     
-    # Flask server'ni background'da ishga tushirish
-    flask_thread = threading.Thread(
-        target=lambda: flask_app.run(host='0.0.0.0', port=WEBHOOK_PORT, debug=False)
+    # Webhook server post_init da bot bilan bitta event loop'da ishga tushadi
+    webhook_server = WebhookServer('0.0.0.0', settings.webhook_port, webhook_routes)
+    return application
+
+def main():
+    """Botni ishga tushirish"""
+    app_settings = load_settings()
+    
+    # Logging: navbat orqali fon thread'da yoziladi, maxfiy ma'lumotlar yashiriladi
+    log_listener = setup_logging(
+        level=app_settings.log_level,
+        log_format=app_settings.log_format,
+        levels=app_settings.log_levels,
+        sampling=app_settings.log_sampling,
+        queue_size=app_settings.log_queue_size
     )
-    flask_thread.daemon = True
-    flask_thread.start()
+    
+    if not app_settings.bot_token:
+        logger.error("BOT_TOKEN topilmadi! .env faylni tekshiring!")
+        log_listener.stop()
+        return
+    
+    application = create_app(app_settings)
     
     logger.info("✅ Bot muvaffaqiyatli ishga tushdi!")
-    logger.info(f"📡 Backend URL: {BACKEND_URL}")
-    logger.info(f"📨 Admin Group ID: {ADMIN_GROUP_ID}")
-    logger.info(f"🌐 Webhook server: http://0.0.0.0:{WEBHOOK_PORT}/webhook/code")
+    logger.info(f"📡 Backend URL: {settings.backend_url}")
+    logger.info(f"📨 Admin Group ID: {settings.admin_group_id}")
+    logger.info(f"🌐 Webhook server: http://0.0.0.0:{settings.webhook_port}/webhook/code")
     
-    application.run_polling(allowed_updates=Update.ALL_TYPES)
+    try:
+        application.run_polling(allowed_updates=Update.ALL_TYPES)
+    finally:
+        # Navbatda qolgan yozuvlarni chiqarib, listener thread'ni to'xtatish
+        log_listener.stop()
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
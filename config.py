@@ -0,0 +1,87 @@
+import os
+
+from dotenv import load_dotenv
+
+
+class Settings:
+    """Bot sozlamalari - muhit o'zgaruvchilaridan (.env) bir marta o'qiladi"""
+
+    def __init__(self, env=None):
+        env = os.environ if env is None else env
+
+        self.backend_url = env.get("BACKEND_URL")
+        self.admin_group_id = env.get("ADMIN_GROUP_ID")
+        self.bot_token = env.get("BOT_TOKEN")
+        self.webhook_port = int(env.get("WEBHOOK_PORT", "3001"))
+        # Bot API manzili (lokal Bot API server yoki load test uchun), token oxiriga qo'shiladi:
+        # TELEGRAM_API_URL="http://127.0.0.1:8081/bot"
+        self.telegram_api_url = env.get("TELEGRAM_API_URL") or None
+
+        # Backend HTTP pool: bitta host uchun ulanishlar, keep-alive, timeout va HTTP/2
+        # (HTTP/2 faqat h2 paketi o'rnatilgan bo'lsa yoqiladi)
+        self.http_max_connections = int(env.get("HTTP_MAX_CONNECTIONS", "100"))
+        self.http_max_keepalive = int(env.get("HTTP_MAX_KEEPALIVE", "20"))
+        self.http_keepalive_expiry = float(env.get("HTTP_KEEPALIVE_EXPIRY", "30"))
+        self.http_timeout = float(env.get("HTTP_TIMEOUT", "10"))
+        self.http2 = env.get("HTTP2", "1") != "0"
+
+        # Bir vaqtda ishlanadigan update'lar soni (bitta chat ichida baribir navbat bilan)
+        self.concurrent_updates = int(env.get("CONCURRENT_UPDATES", "64"))
+
+        # Logging: umumiy daraja, text/json, logger bo'yicha darajalar va sampling
+        # (LOG_LEVELS="httpx=WARNING,backend_client=DEBUG", LOG_SAMPLING="bot=0.1")
+        self.log_level = env.get("LOG_LEVEL", "INFO")
+        self.log_format = env.get("LOG_FORMAT", "text")
+        self.log_levels = env.get("LOG_LEVELS", "httpx=WARNING")
+        self.log_sampling = env.get("LOG_SAMPLING", "")
+        self.log_queue_size = int(env.get("LOG_QUEUE_SIZE", "10000"))
+
+        # Database fayli
+        self.db_file = env.get("DB_FILE", "users.db")
+
+        # Session sozlamalari: OTP muddati, maksimal hajm va tozalash oralig'i (soniya)
+        self.otp_ttl_seconds = int(env.get("OTP_TTL_SECONDS", "300"))
+        self.session_max_size = int(env.get("SESSION_MAX_SIZE", "100000"))
+        self.session_sweep_interval = int(env.get("SESSION_SWEEP_INTERVAL", "60"))
+        # memory - faqat shu process; sqlite - users.db da (restart va bir nechta worker uchun)
+        self.session_backend = env.get("SESSION_BACKEND", "memory")
+
+        # Telegram limitlari: umumiy msg/s, shaxsiy chat msg/s, guruh msg/min
+        self.telegram_global_rate = float(env.get("TELEGRAM_GLOBAL_RATE", "30"))
+        self.telegram_chat_rate = float(env.get("TELEGRAM_CHAT_RATE", "1"))
+        self.telegram_group_rate_per_minute = float(env.get("TELEGRAM_GROUP_RATE_PER_MINUTE", "20"))
+
+        # OTP yetkazish navbati sozlamalari
+        self.otp_queue_size = int(env.get("OTP_QUEUE_SIZE", "1000"))
+        self.otp_workers = int(env.get("OTP_WORKERS", "8"))
+        self.otp_max_retries = int(env.get("OTP_MAX_RETRIES", "5"))
+
+        # OTP tracing: xotirada saqlanadigan span'lar soni va ixtiyoriy JSONL fayl
+        self.trace_buffer_size = int(env.get("TRACE_BUFFER_SIZE", "1000"))
+        self.trace_file = env.get("TRACE_FILE") or None
+
+        # Tarjimalar papkasi (<til>.json fayllar), bo'sh bo'lsa repo'dagi locales/
+        self.locales_dir = env.get("LOCALES_DIR") or None
+        # locales/ fayllari o'zgarganini tekshirish oralig'i (soniya, 0 - faqat SIGHUP orqali)
+        self.i18n_reload_interval = int(env.get("I18N_RELOAD_INTERVAL", "0"))
+
+        # User profil keshi: maksimal hajm va yashash muddati (soniya)
+        self.user_cache_size = int(env.get("USER_CACHE_SIZE", "10000"))
+        self.user_cache_ttl = int(env.get("USER_CACHE_TTL", "300"))
+
+        # Profil yozuvlari write-behind: kechikish (ms) va paket hajmi
+        # USER_WRITE_DELAY_MS=0 - har bir yozuv darhol commit qilinadi (crash'da hech narsa yo'qolmaydi)
+        self.user_write_delay_ms = int(env.get("USER_WRITE_DELAY_MS", "200"))
+        self.user_write_batch_size = int(env.get("USER_WRITE_BATCH_SIZE", "100"))
+
+        # Suhbat holatlari va user_data - restart'dan keyin tiklanadi
+        # (Application har PERSISTENCE_UPDATE_INTERVAL soniyada o'zgarishlarni beradi,
+        # ular PERSISTENCE_FLUSH_DELAY dan keyin bitta tranzaksiyada yoziladi)
+        self.persistence_update_interval = float(env.get("PERSISTENCE_UPDATE_INTERVAL", "5"))
+        self.persistence_flush_delay = float(env.get("PERSISTENCE_FLUSH_DELAY", "0.5"))
+
+
+def load_settings(env_file=None) -> Settings:
+    """.env faylni yuklab, sozlamalarni o'qish"""
+    load_dotenv(env_file)
+    return Settings()
@@ -6,17 +6,7 @@ Botni guruhga qo'shing va /id yuboring
 import logging
 from telegram import Update
 from telegram.ext import Application, CommandHandler, ContextTypes
-from dotenv import load_dotenv
-import os
-
-load_dotenv()
-
-logging.basicConfig(
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    level=logging.INFO
-)
-
-BOT_TOKEN = os.getenv("BOT_TOKEN")
+from config import load_settings
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Start command"""
@@ -61,11 +51,17 @@ async def get_id(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 def main():
     """Bot ishga tushirish"""
-    if not BOT_TOKEN:
+    logging.basicConfig(
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        level=logging.INFO
+    )
+    
+    settings = load_settings()
+    if not settings.bot_token:
         print("❌ BOT_TOKEN topilmadi!")
         return
     
-    app = Application.builder().token(BOT_TOKEN).build()
+    app = Application.builder().token(settings.bot_token).build()
     
     app.add_handler(CommandHandler("start", start))
     app.add_handler(CommandHandler("id", get_id))
@@ -0,0 +1,80 @@
+import logging
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# HTTP/2 faqat h2 paketi o'rnatilgan bo'lsa yoqiladi
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Pool sozlamalari - create_app() da configure() orqali Settings dan o'rnatiladi
+HTTP_MAX_CONNECTIONS = 100  # bitta host uchun
+HTTP_MAX_KEEPALIVE = 20
+HTTP_KEEPALIVE_EXPIRY = 30.0
+HTTP_TIMEOUT = 10.0
+HTTP2_ENABLED = HTTP2_AVAILABLE
+
+# Process bo'yicha umumiy klientlar: {nom: klient}
+# Har bir nom bitta host'ga (masalan backend) to'g'ri keladi, shuning uchun
+# max_connections amalda "host boshiga" limit bo'ladi
+_async_clients = {}
+
+
+def configure(max_connections: int, max_keepalive: int, keepalive_expiry: float, timeout: float, http2: bool):
+    """Pool sozlamalarini o'rnatish (keyingi yaratiladigan klientlar uchun)"""
+    global HTTP_MAX_CONNECTIONS, HTTP_MAX_KEEPALIVE, HTTP_KEEPALIVE_EXPIRY, HTTP_TIMEOUT, HTTP2_ENABLED
+    HTTP_MAX_CONNECTIONS = max_connections
+    HTTP_MAX_KEEPALIVE = max_keepalive
+    HTTP_KEEPALIVE_EXPIRY = keepalive_expiry
+    HTTP_TIMEOUT = timeout
+    HTTP2_ENABLED = HTTP2_AVAILABLE and http2
+    if _async_clients:
+        logger.warning(f"⚠️ HTTP pool sozlamalari o'zgardi, mavjud klientlar: {list(_async_clients)}")
+
+
+def _limits():
+    return httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+    )
+
+
+def get_async_client(name: str) -> httpx.AsyncClient:
+    """Nom bo'yicha umumiy (pooled, keep-alive) asinxron klientni olish"""
+    client = _async_clients.get(name)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(limits=_limits(), timeout=HTTP_TIMEOUT, http2=HTTP2_ENABLED)
+        _async_clients[name] = client
+        logger.info(f"🔌 HTTP pool yaratildi: {name} (http2={HTTP2_ENABLED}, max={HTTP_MAX_CONNECTIONS})")
+    return client
+
+
+def _client_stats(client) -> dict:
+    """Bitta klient holati - faqat httpx ning ochiq API'sidan (httpcore ichki tuzilmalari pinlanmagan)"""
+    return {
+        'closed': client.is_closed,
+        'http2': HTTP2_ENABLED,
+        'max_connections': HTTP_MAX_CONNECTIONS,
+        'max_keepalive': HTTP_MAX_KEEPALIVE,
+        'timeout': HTTP_TIMEOUT,
+    }
+
+
+def pool_stats() -> dict:
+    """Barcha pool'lar statistikasi"""
+    stats = {}
+    for name, client in _async_clients.items():
+        stats[name] = _client_stats(client)
+    return stats
+
+
+async def close_all():
+    """Barcha ulanishlarni yopish (bot to'xtaganda)"""
+    for client in list(_async_clients.values()):
+        await client.aclose()
+    _async_clients.clear()
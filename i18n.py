@@ -0,0 +1,218 @@
+import json
+import logging
+import threading
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LANG = 'uz'
+
+# Tarjimalar - har bir til uchun alohida fayl: locales/<til>.json
+# (boshqa papka - Settings.locales_dir, create_app() configure_translations() ni chaqiradi)
+LOCALES_DIR = Path(__file__).resolve().parent / 'locales'
+
+
+class _Snapshot:
+    """Tarjimalarning bir martalik holati
+
+    Til jadvallari ({kalit: matn}) birinchi ishlatilganda yuklanadi va
+    DEFAULT_LANG dan fallback oldindan hal qilinadi.
+    """
+
+    def __init__(self, directory: Path, generation: int):
+        self.generation = generation
+        self.languages = tuple(sorted(path.stem for path in directory.glob('*.json')))
+        self.mtimes = {path.name: path.stat().st_mtime for path in directory.glob('*.json')}
+        self.bundles = {DEFAULT_LANG: _read_bundle(directory, DEFAULT_LANG)}
+        self.tables = {DEFAULT_LANG: dict(self.bundles[DEFAULT_LANG])}
+
+
+def _read_bundle(directory: Path, lang: str) -> dict:
+    with open(directory / f"{lang}.json", encoding='utf-8') as f:
+        bundle = json.load(f)
+    if not isinstance(bundle, dict):
+        raise ValueError(f"{lang}.json: obyekt (kalit -> matn) bo'lishi kerak")
+    return bundle
+
+
+def _problems(reference: dict, bundle: dict) -> dict:
+    return {
+        'missing': sorted(set(reference) - set(bundle)),
+        'extra': sorted(set(bundle) - set(reference)),
+    }
+
+
+class Catalog:
+    """Tarjimalar katalogi - tillar kerak bo'lganda yuklanadi, reload() atomar almashtiradi"""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._listeners = []
+        # Joriy holatning til jadvallari {til: {kalit: matn}} - reload() bitta
+        # o'zlashtirish bilan almashtiradi, get_text() to'g'ridan-to'g'ri o'qiydi
+        self.texts = {}
+
+    def _current(self) -> _Snapshot:
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = _Snapshot(self.directory, generation=1)
+                    self.texts = self._snapshot.tables
+                snapshot = self._snapshot
+        return snapshot
+
+    def _compile(self, snapshot: _Snapshot, lang: str) -> dict:
+        """Tilni yuklab, DEFAULT_LANG kalitlari bo'yicha to'liq jadvalga aylantirish"""
+        bundle = _read_bundle(self.directory, lang)
+        default = snapshot.bundles[DEFAULT_LANG]
+        snapshot.bundles[lang] = bundle
+        return {key: bundle.get(key, text) for key, text in default.items()}
+
+    def table(self, lang) -> dict:
+        """Til jadvali (noma'lum til bo'lsa DEFAULT_LANG)"""
+        snapshot = self._current()
+        table = snapshot.tables.get(lang)
+        if table is not None:
+            return table
+        if lang not in snapshot.languages:
+            return snapshot.tables[DEFAULT_LANG]
+        with self._lock:
+            table = snapshot.tables.get(lang)
+            if table is None:
+                table = self._compile(snapshot, lang)
+                snapshot.tables[lang] = table
+                logger.info(f"🌐 Tarjimalar yuklandi: {lang}")
+        return table
+
+    def get_text(self, lang, key):
+        table = self.texts.get(lang)
+        if table is None:
+            table = self.table(lang)
+        return table.get(key, key)
+
+    def languages(self) -> tuple:
+        """Mavjud tillar: DEFAULT_LANG dagi til nomlari tartibida, keyin qolganlari"""
+        snapshot = self._current()
+        default = snapshot.bundles[DEFAULT_LANG]
+        ordered = [lang for lang in default if lang in snapshot.languages]
+        ordered.extend(lang for lang in snapshot.languages if lang not in ordered)
+        return tuple(ordered)
+
+    def language_name(self, lang) -> str:
+        """Til tugmasidagi nom (DEFAULT_LANG da bo'lmasa, tilning o'z faylidan)"""
+        name = self._current().bundles[DEFAULT_LANG].get(lang)
+        if name is None:
+            self.table(lang)
+            name = self._current().bundles.get(lang, {}).get(lang, lang)
+        return name
+
+    @property
+    def generation(self) -> int:
+        return self._current().generation
+
+    def changed_on_disk(self) -> bool:
+        """locales/ dagi fayllar o'zgarganmi (qo'shilgan, o'chirilgan yoki tahrirlangan)"""
+        current = {path.name: path.stat().st_mtime for path in self.directory.glob('*.json')}
+        return current != self._current().mtimes
+
+    def reload(self) -> bool:
+        """Fayllarni qayta o'qib, holatni bitta almashtirish bilan yangilash
+
+        Oldin yuklangan tillar yangi holatda darhol kompilyatsiya qilinadi, xato
+        bo'lsa eski holat saqlanib qoladi. Suhbatlar faqat til kodini saqlaydi,
+        shuning uchun davom etayotgan suhbatlar uzilmaydi.
+        """
+        old = self._current()
+        try:
+            snapshot = _Snapshot(self.directory, generation=old.generation + 1)
+            for lang in old.tables:
+                if lang in snapshot.languages and lang not in snapshot.tables:
+                    snapshot.tables[lang] = self._compile(snapshot, lang)
+        except (OSError, ValueError) as e:
+            logger.error(f"❌ Tarjimalarni qayta yuklab bo'lmadi, eskisi qoldi: {e}")
+            return False
+        with self._lock:
+            self._snapshot = snapshot
+            self.texts = snapshot.tables
+        logger.info(f"🔄 Tarjimalar qayta yuklandi (v{snapshot.generation}): {', '.join(snapshot.languages)}")
+        try:
+            self.validate()
+        except (OSError, ValueError) as e:
+            logger.error(f"❌ Tarjimalarni tekshirib bo'lmadi: {e}")
+        for callback in self._listeners:
+            callback()
+        return True
+
+    def set_directory(self, directory):
+        """Tarjimalar papkasini almashtirish - tillar yangi papkadan kerak bo'lganda yuklanadi"""
+        directory = Path(directory)
+        if directory == self.directory:
+            return
+        with self._lock:
+            self.directory = directory
+            self._snapshot = None
+            self.texts = {}
+        for callback in self._listeners:
+            callback()
+
+    def on_reload(self, callback):
+        """reload() dan keyin chaqiriladigan funksiyani ro'yxatdan o'tkazish (keshlarni tozalash uchun)"""
+        self._listeners.append(callback)
+
+    def validate(self) -> dict:
+        """Barcha tillar uchun DEFAULT_LANG ga nisbatan yetishmayotgan va ortiqcha kalitlar (log'ga ham yoziladi)"""
+        default = self._current().bundles[DEFAULT_LANG]
+        report = {}
+        for lang in self._current().languages:
+            problems = _problems(default, _read_bundle(self.directory, lang))
+            if problems['missing']:
+                logger.warning(f"⚠️ [{lang}] tarjima yo'q ({DEFAULT_LANG} dan olinadi): {', '.join(problems['missing'])}")
+            if problems['extra']:
+                logger.warning(f"⚠️ [{lang}] ortiqcha kalitlar: {', '.join(problems['extra'])}")
+            if problems['missing'] or problems['extra']:
+                report[lang] = problems
+        return report
+
+
+catalog = Catalog(LOCALES_DIR)
+
+
+def get_text(lang, key):
+    """Tarjima olish (yuklangan til uchun ikkita dict.get, metod chaqiriqlarisiz)"""
+    table = catalog.texts.get(lang)
+    if table is None:
+        table = catalog.table(lang)
+    return table.get(key, key)
+
+
+def available_languages() -> tuple:
+    """Mavjud til kodlari"""
+    return catalog.languages()
+
+
+def language_name(lang) -> str:
+    """Til nomi (til tanlash tugmasi uchun)"""
+    return catalog.language_name(lang)
+
+
+def reload_translations() -> bool:
+    """Tarjimalarni fayllardan qayta yuklash"""
+    return catalog.reload()
+
+
+def on_reload(callback):
+    """Tarjimalar qayta yuklanganda chaqiriladigan funksiya"""
+    catalog.on_reload(callback)
+
+
+def configure_translations(directory=None):
+    """Tarjimalar papkasini sozlash (None - LOCALES_DIR)"""
+    catalog.set_directory(directory or LOCALES_DIR)
+
+
+def validate_translations() -> dict:
+    """Tarjimalar tekshiruvi (barcha tillarni o'qiydi)"""
+    return catalog.validate()
@@ -0,0 +1,141 @@
+from types import MappingProxyType
+
+from telegram import ReplyKeyboardMarkup, KeyboardButton
+
+from i18n import DEFAULT_LANG, available_languages, get_text, language_name, on_reload
+
+
+def _build_lang_keyboard():
+    """Modern til tanlash klaviaturasi (locales/ dagi barcha tillar)"""
+    keyboard = [[KeyboardButton(language_name(lang))] for lang in available_languages()]
+    return ReplyKeyboardMarkup(keyboard, resize_keyboard=True, one_time_keyboard=True)
+
+
+def _build_main_menu_keyboard(lang):
+    """Modern asosiy menyu"""
+    keyboard = [
+        [KeyboardButton(get_text(lang, 'profile')), KeyboardButton(get_text(lang, 'contact_admin'))],
+        [KeyboardButton(get_text(lang, 'change_phone')), KeyboardButton(get_text(lang, 'forgot_password'))],
+        [KeyboardButton(get_text(lang, 'settings')), KeyboardButton(get_text(lang, 'logout'))]
+    ]
+    return ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
+
+
+def _build_back_keyboard(lang):
+    """Orqaga tugmasi"""
+    keyboard = [[KeyboardButton(get_text(lang, 'back'))]]
+    return ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
+
+
+def _build_phone_contact_keyboard(lang):
+    """Telefon raqamni yuborish tugmasi"""
+    keyboard = [
+        [KeyboardButton(get_text(lang, 'send_phone_contact'), request_contact=True)],
+        [KeyboardButton(get_text(lang, 'back'))]
+    ]
+    return ReplyKeyboardMarkup(keyboard, resize_keyboard=True, one_time_keyboard=True)
+
+
+def _build_main_choice_keyboard(lang):
+    """Asosiy tanlov tugmalari"""
+    keyboard = [
+        [KeyboardButton(get_text(lang, 'login'))],
+        [KeyboardButton(get_text(lang, 'get_code'))]
+    ]
+    return ReplyKeyboardMarkup(keyboard, resize_keyboard=True, one_time_keyboard=True)
+
+
+def _build_code_menu_keyboard(lang):
+    """Kod olish menyusi tugmalari"""
+    keyboard = [
+        [KeyboardButton(get_text(lang, 'get_code_login'))],
+        [KeyboardButton(get_text(lang, 'get_code_register'))],
+        [KeyboardButton(get_text(lang, 'get_code_forgot'))],
+        [KeyboardButton(get_text(lang, 'back'))]
+    ]
+    return ReplyKeyboardMarkup(keyboard, resize_keyboard=True, one_time_keyboard=True)
+
+
+def _build_otp_back_keyboard():
+    """OTP kod xabari ostidagi "Orqaga" tugmasi"""
+    return ReplyKeyboardMarkup([[KeyboardButton("🔙 Orqaga")]], resize_keyboard=True, one_time_keyboard=False)
+
+
+def _build_keyboards(lang):
+    """Bitta til uchun barcha klaviaturalarni yaratish
+
+    ReplyKeyboardMarkup obyektlari o'zgarmas (frozen), shuning uchun bitta obyekt
+    barcha javoblarda xavfsiz qayta ishlatiladi.
+    """
+    return MappingProxyType({
+        'main_menu': _build_main_menu_keyboard(lang),
+        'back': _build_back_keyboard(lang),
+        'phone_contact': _build_phone_contact_keyboard(lang),
+        'main_choice': _build_main_choice_keyboard(lang),
+        'code_menu': _build_code_menu_keyboard(lang),
+    })
+
+
+# Har bir til uchun bir marta yaratiladi (til birinchi ishlatilganda),
+# tarjimalar qayta yuklanganda tozalanadi
+_registry = {}  # {lang: {nom: ReplyKeyboardMarkup}}
+_lang_keyboard = None
+OTP_BACK_KEYBOARD = _build_otp_back_keyboard()
+
+
+def _clear_registry():
+    global _lang_keyboard
+    _registry.clear()
+    _lang_keyboard = None
+
+
+on_reload(_clear_registry)
+
+
+def _keyboards(lang):
+    keyboards = _registry.get(lang)
+    if keyboards is None:
+        if lang not in available_languages():
+            lang = DEFAULT_LANG
+        keyboards = _registry.get(lang)
+        if keyboards is None:
+            keyboards = _registry[lang] = _build_keyboards(lang)
+    return keyboards
+
+
+def get_lang_keyboard():
+    """Til tanlash klaviaturasi"""
+    global _lang_keyboard
+    if _lang_keyboard is None:
+        _lang_keyboard = _build_lang_keyboard()
+    return _lang_keyboard
+
+
+def get_main_menu_keyboard(lang):
+    """Asosiy menyu"""
+    return _keyboards(lang)['main_menu']
+
+
+def get_back_keyboard(lang):
+    """Orqaga tugmasi"""
+    return _keyboards(lang)['back']
+
+
+def get_phone_contact_keyboard(lang):
+    """Telefon raqamni yuborish tugmasi"""
+    return _keyboards(lang)['phone_contact']
+
+
+def get_main_choice_keyboard(lang):
+    """Asosiy tanlov tugmalari"""
+    return _keyboards(lang)['main_choice']
+
+
+def get_code_menu_keyboard(lang):
+    """Kod olish menyusi tugmalari"""
+    return _keyboards(lang)['code_menu']
+
+
+def get_otp_back_keyboard():
+    """OTP kod xabari ostidagi "Orqaga" tugmasi"""
+    return OTP_BACK_KEYBOARD
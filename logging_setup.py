@@ -0,0 +1,165 @@
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import re
+import sys
+from datetime import datetime, timezone
+
+# Maxfiy ma'lumotlar - hamma log yozuvlari chiqishdan oldin shu yerda yashiriladi
+REDACT_PATTERNS = (
+    # accessToken, refresh_token, resetToken, password, newPassword (qiymat qo'shtirnoqda bo'lishi mumkin)
+    (re.compile(r'''((?:access|refresh|reset)_?token|password|newpassword)(["']?\s*[:=]\s*)("[^"]*"|'[^']*'|[^\s,}]+)''',
+                re.IGNORECASE), r'\1\2***'),
+    (re.compile(r'(bearer\s+)\S+', re.IGNORECASE), r'\1***'),
+    # code=1234, 'code': '1234', code: 1234, kodingiz: <b>1234</b>
+    (re.compile(r'''\b(code|kod\w*)(["']?\s*[:=]\s*(?:<b>)?["']?)(\w+)''', re.IGNORECASE), r'\1\2***'),
+    # Bot API URL'laridagi token: .../bot123456:AAE.../sendMessage -> .../bot<redacted>/sendMessage
+    (re.compile(r'bot\d+:[A-Za-z0-9_-]{30,}'), 'bot<redacted>'),
+    # +998901234567 -> +99890*****67 (hex ID'lar ichidagi raqamlar emas)
+    (re.compile(r'(?<![\w+])(\+?998\d{2})\d{5}(\d{2})\b'), r'\1*****\2'),
+)
+
+# LogRecord ning standart atributlari - qolganlari (extra=...) JSON'ga qo'shiladi
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
+def redact(text: str) -> str:
+    """Matndagi kod, token, parol va telefon raqamlarni yashirish"""
+    for pattern, replacement in REDACT_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def redact_extra(key: str, value):
+    """extra=... maydoni: kalit=qiymat ko'rinishida yashiriladi, o'zgarmasa asl qiymat qaytadi"""
+    text = value if isinstance(value, str) else json.dumps(value, ensure_ascii=False, default=str)
+    redacted = redact(f"{key}={text}").partition('=')[2]
+    return value if redacted == text else redacted
+
+
+def parse_mapping(value: str) -> dict:
+    """"bot=DEBUG,httpx=WARNING" -> {'bot': 'DEBUG', 'httpx': 'WARNING'}"""
+    mapping = {}
+    for item in (value or '').split(','):
+        name, sep, setting = item.partition('=')
+        if sep and name.strip():
+            mapping[name.strip()] = setting.strip()
+    return mapping
+
+
+def _match(name: str, table: dict):
+    """Logger nomi bo'yicha eng aniq (eng uzun prefiks) mos sozlama"""
+    while name:
+        if name in table:
+            return table[name]
+        name = name.rpartition('.')[0]
+    return table.get('')
+
+
+class RedactingFilter(logging.Filter):
+    """Xabarni formatlab, maxfiy qismlarini yashiradi (listener thread'da ishlaydi)"""
+
+    def filter(self, record):
+        record.msg = redact(record.getMessage())
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        if record.exc_text:
+            record.exc_text = redact(record.exc_text)
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Logger bo'yicha INFO/DEBUG yozuvlarining faqat bir qismini o'tkazish
+
+    rates - {logger prefiksi: 0..1}. WARNING va undan yuqorisi har doim o'tadi.
+    """
+
+    def __init__(self, rates: dict):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = _match(record.name, self.rates)
+        return rate is None or random.random() < rate
+
+
+class JsonFormatter(logging.Formatter):
+    """Bir qator - bitta JSON obyekt (time, level, logger, message, extra maydonlar)"""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = redact_extra(key, value)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exc_info'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Yozuvni navbatga qo'yadi - formatlash va chiqarish listener thread'da
+
+    Navbat to'lsa yozuv tashlab yuboriladi (event loop kutmaydi).
+    """
+
+    dropped = 0
+
+    def prepare(self, record):
+        # Xabar listener thread'da formatlanadi. O'zgaruvchan argumentlar
+        # (dict, list, ...) keyinroq o'zgarishi mumkin - ularni hozir formatlaymiz.
+        if record.args and not all(isinstance(arg, (str, int, float, bool, type(None))) for arg in
+                                   (record.args.values() if isinstance(record.args, dict) else record.args)):
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            NonBlockingQueueHandler.dropped += 1
+
+
+def setup_logging(level: str = 'INFO', log_format: str = 'text', levels: str = '', sampling: str = '',
+                  queue_size: int = 10000) -> logging.handlers.QueueListener:
+    """Root logger'ni navbat orqali ishlaydigan fon yozuvchisiga ulash
+
+    level - umumiy daraja; levels - "httpx=WARNING,backend_client=DEBUG";
+    sampling - "bot=0.1" (bot logger'ining INFO/DEBUG yozuvlaridan 10%);
+    log_format - text yoki json. Qaytarilgan listener to'xtash paytida stop() qilinadi.
+    """
+    output = logging.StreamHandler(sys.stderr)
+    output.setFormatter(JsonFormatter() if log_format == 'json' else logging.Formatter(TEXT_FORMAT))
+    output.addFilter(RedactingFilter())
+
+    log_queue = queue.Queue(maxsize=queue_size)
+    handler = NonBlockingQueueHandler(log_queue)
+    rates = {name: float(rate) for name, rate in parse_mapping(sampling).items()}
+    if rates:
+        handler.addFilter(SamplingFilter(rates))
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level.upper())
+    for name, logger_level in parse_mapping(levels).items():
+        logging.getLogger(name).setLevel(logger_level.upper())
+
+    listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    listener.start()
+    return listener
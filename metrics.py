@@ -0,0 +1,169 @@
+import time
+from contextlib import contextmanager
+
+# Prometheus text format (0.0.4) uchun minimal metrikalar - tashqi kutubxonasiz.
+# Metrikalar event loop'dan yangilanadi, shuning uchun lock ishlatilmaydi.
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Sekundlarda: tez handler'lardan (ms) sekin backend/Telegram so'rovlarigacha
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in (*zip(names, values), *extra)]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Registry:
+    """Metrikalar ro'yxati - render() barcha metrikalarni Prometheus formatida qaytaradi"""
+
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metrika allaqachon mavjud: {metric.name}")
+        self._metrics[metric.name] = metric
+
+    def unregister(self, metric):
+        self._metrics.pop(metric.name, None)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.family_name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.family_name} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+
+class _Metric:
+    type = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames=(), registry: Registry = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}  # {label qiymatlari (tuple): qiymat}
+        (REGISTRY if registry is None else registry).register(self)
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: label'lar {self.labelnames} bo'lishi kerak, berildi {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    @property
+    def family_name(self) -> str:
+        """# HELP/# TYPE qatorlaridagi nom"""
+        return self.name
+
+
+class Counter(_Metric):
+    """Faqat o'sadigan hisoblagich"""
+
+    type = 'counter'
+
+    @property
+    def family_name(self) -> str:
+        # prometheus_client 0.0.4 formatidagidek - metadata ham _total nomi bilan
+        return f"{self.name}_total"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        for key, value in self._values.items():
+            yield self.family_name, _format_labels(self.labelnames, key), value
+
+
+class Gauge(_Metric):
+    """Joriy qiymat - set() bilan yoki scrape paytida function() dan olinadi
+
+    function label qiymatlari (tuple) -> qiymat dict'ini qaytaradi
+    (label'siz gauge uchun oddiy son).
+    """
+
+    type = 'gauge'
+
+    def __init__(self, name: str, documentation: str, labelnames=(), registry: Registry = None, function=None):
+        super().__init__(name, documentation, labelnames, registry)
+        self.function = function
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def samples(self):
+        values = self._values
+        if self.function is not None:
+            values = self.function()
+            if not isinstance(values, dict):
+                values = {(): values}
+        for key, value in values.items():
+            yield self.name, _format_labels(self.labelnames, key), value
+
+
+class Histogram(_Metric):
+    """Kechikishlar taqsimoti (kumulyativ bucket'lar, _sum va _count)"""
+
+    type = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames=(), registry: Registry = None,
+                 buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        series = self._values.get(key)
+        if series is None:
+            # [bucket'lar bo'yicha hisob..., +Inf, sum]
+            series = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += 1
+        series[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """with blokining davomiyligini o'lchash (xatolik bo'lsa ham yoziladi)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self):
+        for key, series in self._values.items():
+            for bound, count in zip((*self.buckets, float('inf')), series):
+                yield f"{self.name}_bucket", _format_labels(self.labelnames, key, [('le', _format_value(bound))]), count
+            yield f"{self.name}_sum", _format_labels(self.labelnames, key), series[-1]
+            yield f"{self.name}_count", _format_labels(self.labelnames, key), series[-2]
+
+
+def render() -> str:
+    """Umumiy registry'dagi barcha metrikalar"""
+    return REGISTRY.render()
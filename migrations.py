@@ -0,0 +1,107 @@
+import logging
+import sqlite3
+import time
+
+logger = logging.getLogger(__name__)
+
+# users.db sxemasi - har bir migratsiya bir marta, tartib bilan qo'llanadi.
+# Joriy versiya PRAGMA user_version da saqlanadi. Qo'llangan migratsiyani
+# o'zgartirmang - yangi o'zgarish uchun ro'yxat oxiriga yangi versiya qo'shing.
+MIGRATIONS = (
+    (1, "users jadvali", (
+        '''
+        CREATE TABLE IF NOT EXISTS users (
+            user_id INTEGER PRIMARY KEY,
+            phone TEXT NOT NULL,
+            full_name TEXT,
+            role TEXT,
+            balans TEXT,
+            access_token TEXT,
+            refresh_token TEXT,
+            lang TEXT DEFAULT 'uz',
+            logged_in BOOLEAN DEFAULT FALSE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+    )),
+    (2, "users.phone indeksi", (
+        'CREATE INDEX IF NOT EXISTS idx_users_phone ON users(phone)',
+    )),
+    (3, "users.logged_in indeksi", (
+        'CREATE INDEX IF NOT EXISTS idx_users_logged_in ON users(logged_in)',
+    )),
+    (4, "sessions jadvali (SESSION_BACKEND=sqlite)", (
+        '''
+        CREATE TABLE IF NOT EXISTS sessions (
+            normalized_phone TEXT PRIMARY KEY,
+            chat_id INTEGER NOT NULL,
+            expires_at REAL NOT NULL
+        )
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_sessions_expires_at ON sessions(expires_at)',
+    )),
+    (5, "conversations va user_data jadvallari (persistence)", (
+        '''
+        CREATE TABLE IF NOT EXISTS conversations (
+            name TEXT NOT NULL,
+            key TEXT NOT NULL,
+            state TEXT NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (name, key)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS user_data (
+            user_id INTEGER PRIMARY KEY,
+            data TEXT NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+    )),
+)
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version(conn: sqlite3.Connection) -> int:
+    """Bazaning sxema versiyasi"""
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """Qo'llanmagan migratsiyalarni qo'llash, yangi versiyani qaytaradi
+
+    Har bir migratsiya user_version bilan birga bitta tranzaksiyada bajariladi:
+    xatolik bo'lsa o'sha migratsiya to'liq bekor qilinadi.
+    """
+    version = current_version(conn)
+    if version > LATEST_VERSION:
+        raise RuntimeError(f"users.db versiyasi ({version}) koddagidan ({LATEST_VERSION}) yangi")
+
+    pending = [migration for migration in MIGRATIONS if migration[0] > version]
+    if not pending:
+        logger.info(f"✅ DB sxemasi yangi (v{version})")
+        return version
+
+    started = time.perf_counter()
+    for number, description, statements in pending:
+        migration_started = time.perf_counter()
+        try:
+            conn.execute('BEGIN')
+            for sql in statements:
+                conn.execute(sql)
+            # PRAGMA parametr qabul qilmaydi - number bizning butun sonimiz
+            conn.execute(f'PRAGMA user_version = {int(number)}')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            logger.exception(f"❌ Migratsiya v{number} ({description}) muvaffaqiyatsiz")
+            raise
+        elapsed = (time.perf_counter() - migration_started) * 1000
+        logger.info(f"🛠 Migratsiya v{number}: {description} ({elapsed:.1f} ms)")
+        version = number
+
+    elapsed = (time.perf_counter() - started) * 1000
+    logger.info(f"✅ DB sxemasi v{version} gacha yangilandi: {len(pending)} ta migratsiya, {elapsed:.1f} ms")
+    return version
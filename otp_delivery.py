@@ -0,0 +1,138 @@
+import asyncio
+import logging
+import random
+import time
+
+from telegram.error import BadRequest, Forbidden, InvalidToken, NetworkError, RetryAfter, TimedOut
+
+logger = logging.getLogger(__name__)
+
+
+class OTPDeliveryQueue:
+    """OTP kodlarni yetkazish navbati
+
+    Webhook faqat vazifani navbatga qo'yadi va darhol javob qaytaradi, bir nechta
+    asinxron worker navbatni bo'shatadi. Navbat hajmi cheklangan (to'lsa submit()
+    False qaytaradi). Telegram 5xx/tarmoq xatolarida vazifa exponential backoff
+    bilan qayta yuboriladi. 429 ni faqat OutboundScheduler qayta yuboradi, TimedOut
+    qayta yuborilmaydi (xabar yetib borgan bo'lishi mumkin - kod ikki marta kelmasin).
+    Hamma urinishlar code_ttl bilan cheklanadi: muddati o'tgan kod yuborilmaydi.
+    """
+
+    def __init__(self, send_func, workers: int = 4, maxsize: int = 1000,
+                 max_retries: int = 5, base_delay: float = 0.5, max_delay: float = 30.0,
+                 code_ttl: float = None):
+        # send_func(chat_id, code, phone_number, trace_id) - kodni Telegram'ga yuboradigan coroutine
+        self._send = send_func
+        self.workers = workers
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.code_ttl = code_ttl  # soniya, None - cheklanmagan
+        self._queue = asyncio.Queue(maxsize=maxsize)
+        self._tasks = []
+        self.delivered = 0
+        self.failed = 0
+        self.retried = 0
+        self.rejected = 0
+        self.expired = 0
+
+    def submit(self, chat_id: int, code: str, phone_number: str = None, trace_id: str = None) -> bool:
+        """Vazifani navbatga qo'yish, navbat to'la bo'lsa False"""
+        try:
+            deadline = None if self.code_ttl is None else time.monotonic() + self.code_ttl
+            self._queue.put_nowait((chat_id, code, phone_number, trace_id, deadline))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            return False
+        return True
+
+    async def start(self):
+        """Worker'larni ishga tushirish"""
+        for n in range(self.workers):
+            self._tasks.append(asyncio.create_task(self._worker(), name=f"otp-delivery-{n}"))
+        logger.info(f"📬 OTP delivery: {self.workers} ta worker, navbat hajmi {self._queue.maxsize}")
+
+    async def stop(self, timeout: float = 10.0):
+        """Navbatdagi vazifalarni (timeout gacha) yetkazib, worker'larni to'xtatish"""
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"⚠️ OTP navbatida {self._queue.qsize()} ta vazifa yetkazilmay qoldi")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    async def _worker(self):
+        while True:
+            chat_id, code, phone_number, trace_id, deadline = await self._queue.get()
+            try:
+                await self._deliver(chat_id, code, phone_number, trace_id, deadline)
+            finally:
+                self._queue.task_done()
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(self.base_delay * (2 ** attempt), self.max_delay)
+        return delay + random.uniform(0, delay / 2)
+
+    async def _deliver(self, chat_id, code, phone_number, trace_id, deadline=None):
+        for attempt in range(self.max_retries + 1):
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                break
+            try:
+                # Rate limiter navbati va 429 kutishlari ham kod muddatidan oshmaydi
+                await asyncio.wait_for(self._send(chat_id, code, phone_number, trace_id), remaining)
+                self.delivered += 1
+                return
+            except asyncio.TimeoutError:
+                break
+            except RetryAfter as e:
+                # OutboundScheduler 429 ni o'zi qayta yuboradi - bu yerga kelsa urinishlar tugagan
+                logger.error(f"❌ Kod yuborilmadi (flood control): chat_id={chat_id}: {e}")
+                self.failed += 1
+                return
+            except TimedOut as e:
+                # Javob kelmadi, lekin xabar yetib borgan bo'lishi mumkin - qayta yubormaymiz
+                logger.warning(f"⚠️ Kod yuborishda timeout, qayta yuborilmaydi: chat_id={chat_id}: {e}")
+                self.failed += 1
+                return
+            except (BadRequest, Forbidden, InvalidToken) as e:
+                # Qayta yuborish foyda bermaydi (chat yo'q, bot bloklangan va h.k.)
+                logger.error(f"❌ Kod yuborilmadi: chat_id={chat_id}: {e}")
+                self.failed += 1
+                return
+            except NetworkError as e:
+                # 5xx va tarmoq xatolari
+                delay = self._backoff(attempt)
+                logger.warning(f"⚠️ Kod yuborishda xatolik (urinish {attempt + 1}): chat_id={chat_id}: {e}")
+            except Exception as e:
+                logger.exception(f"❌ Kod yuborish xatolik: chat_id={chat_id}: {e}")
+                self.failed += 1
+                return
+
+            if attempt < self.max_retries:
+                if deadline is not None and time.monotonic() + delay >= deadline:
+                    break
+                self.retried += 1
+                await asyncio.sleep(delay)
+        else:
+            self.failed += 1
+            return
+        # Kod muddati o'tdi - endi yuborishdan foyda yo'q
+        logger.warning(f"⌛ Kod muddati o'tdi, yuborilmadi: chat_id={chat_id}")
+        self.expired += 1
+
+    def stats(self) -> dict:
+        """Navbat metrikalari"""
+        return {
+            'depth': self._queue.qsize(),
+            'maxsize': self._queue.maxsize,
+            'workers': self.workers,
+            'delivered': self.delivered,
+            'failed': self.failed,
+            'retried': self.retried,
+            'rejected': self.rejected,
+            'expired': self.expired,
+        }
@@ -0,0 +1,213 @@
+import asyncio
+import logging
+import time
+from collections import deque
+
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Navbat ustuvorliklari (kichik raqam - birinchi yuboriladi). 0 bo'lmasligi kerak:
+# ExtBot rate_limit_args falsy bo'lsa uni tashlab yuboradi (process_request ga None keladi)
+PRIORITY_OTP = 1
+PRIORITY_ADMIN = 2
+PRIORITY_DEFAULT = 3
+PRIORITY_NAMES = {PRIORITY_OTP: 'otp', PRIORITY_ADMIN: 'admin', PRIORITY_DEFAULT: 'default'}
+
+TELEGRAM_LATENCY = metrics.Histogram(
+    'telegram_request_duration_seconds', "Telegram Bot API so'rovlari davomiyligi (navbatsiz)", ['method'])
+TELEGRAM_QUEUE_WAIT = metrics.Histogram(
+    'telegram_queue_wait_seconds', "Rate limiter navbatida kutish vaqti", ['priority'])
+TELEGRAM_ERRORS = metrics.Counter(
+    'telegram_errors', "Telegram Bot API xatoliklari", ['method', 'error'])
+
+
+class TokenBucket:
+    """Oddiy token bucket: sekundiga rate ta token, ko'pi bilan capacity ta"""
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Keyingi token uchun necha soniya kutish kerak (0 - hozir bor)"""
+        self.refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self):
+        self.tokens -= 1
+
+
+class OutboundScheduler(BaseRateLimiter[int]):
+    """Telegram'ga chiquvchi barcha so'rovlar uchun rejalashtiruvchi
+
+    Umumiy (~30 msg/s) va har bir chat uchun (shaxsiy ~1 msg/s, guruh ~20 msg/min)
+    token bucket'lar bilan cheklaydi. Kutayotgan so'rovlar ustuvorlik bo'yicha
+    navbatlarda turadi (OTP kodlar, keyin admin murojaatlari, keyin qolganlari).
+    rate_limit_args - so'rov ustuvorligi (PRIORITY_*). Telegram 429 qaytarsa,
+    retry_after davomida hamma yuborish to'xtatiladi va so'rov qayta yuboriladi
+    (429 faqat shu yerda qayta yuboriladi - chaqiruvchilar uni takrorlamaydi).
+    """
+
+    def __init__(self, global_rate: float = 30.0, private_rate: float = 1.0, private_burst: float = 3.0,
+                 group_rate_per_minute: float = 20.0, max_retries: int = 3, max_tracked_chats: int = 10000):
+        self.global_rate = global_rate
+        self.private_rate = private_rate
+        self.private_burst = private_burst
+        self.group_rate = group_rate_per_minute / 60
+        self.max_retries = max_retries
+        self.max_tracked_chats = max_tracked_chats
+        self._global = None
+        self._chats = {}  # {chat_id: TokenBucket}
+        self._lanes = {PRIORITY_OTP: deque(), PRIORITY_ADMIN: deque(), PRIORITY_DEFAULT: deque()}
+        self._wakeup = asyncio.Event()
+        self._paused_until = 0.0
+        self._dispatcher = None
+        self.sent = 0
+        self.throttled = 0
+        self.retry_after_hits = 0
+
+    async def initialize(self):
+        loop = asyncio.get_running_loop()
+        self._global = TokenBucket(self.global_rate, self.global_rate, loop.time())
+        self._dispatcher = asyncio.create_task(self._dispatch(), name="outbound-scheduler")
+
+    async def shutdown(self):
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            await asyncio.gather(self._dispatcher, return_exceptions=True)
+            self._dispatcher = None
+        for lane in self._lanes.values():
+            for _, future in lane:
+                future.cancel()
+            lane.clear()
+
+    def _is_group(self, chat_id) -> bool:
+        # Guruh/kanal ID lari manfiy yoki @username ko'rinishida
+        if isinstance(chat_id, str):
+            try:
+                chat_id = int(chat_id)
+            except ValueError:
+                return True
+        return chat_id < 0
+
+    def _chat_bucket(self, chat_id, now: float) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if len(self._chats) >= self.max_tracked_chats:
+                self._prune(now)
+            if self._is_group(chat_id):
+                bucket = TokenBucket(self.group_rate, 1, now)
+            else:
+                bucket = TokenBucket(self.private_rate, self.private_burst, now)
+            self._chats[chat_id] = bucket
+        return bucket
+
+    def _prune(self, now: float):
+        """To'liq to'lgan (ya'ni uzoq vaqt ishlatilmagan) chat bucket'larini o'chirish"""
+        for chat_id, bucket in list(self._chats.items()):
+            bucket.refill(now)
+            if bucket.tokens >= bucket.capacity:
+                del self._chats[chat_id]
+
+    async def _dispatch(self):
+        """Token bor bo'lganda eng yuqori ustuvorlikdagi tayyor so'rovni o'tkazib yuborish"""
+        loop = asyncio.get_running_loop()
+        while True:
+            now = loop.time()
+            delay = max(self._paused_until - now, self._global.wait_time(now))
+            if delay <= 0:
+                delay = self._release_next(now)
+                if delay == 0:
+                    continue
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def _release_next(self, now: float):
+        """Bitta so'rovga ruxsat berish; ruxsat berilsa 0, aks holda kutish vaqti (None - navbat bo'sh)"""
+        min_wait = None
+        for priority in sorted(self._lanes):
+            lane = self._lanes[priority]
+            for item in lane:
+                chat_id, future = item
+                if future.done():
+                    continue
+                bucket = None if chat_id is None else self._chat_bucket(chat_id, now)
+                wait = 0.0 if bucket is None else bucket.wait_time(now)
+                if wait <= 0:
+                    lane.remove(item)
+                    self._global.consume()
+                    if bucket is not None:
+                        bucket.consume()
+                    future.set_result(None)
+                    return 0
+                min_wait = wait if min_wait is None else min(min_wait, wait)
+            # Bekor qilingan so'rovlarni tozalash
+            while lane and lane[0][1].done():
+                lane.popleft()
+        if min_wait is not None:
+            self.throttled += 1
+        return min_wait
+
+    async def _acquire(self, chat_id, priority: int):
+        future = asyncio.get_running_loop().create_future()
+        self._lanes.get(priority, self._lanes[PRIORITY_DEFAULT]).append((chat_id, future))
+        self._wakeup.set()
+        await future
+
+    async def process_request(self, callback, args, kwargs, endpoint, data, rate_limit_args):
+        priority = PRIORITY_DEFAULT if rate_limit_args is None else rate_limit_args
+        chat_id = data.get('chat_id')
+        attempt = 0
+        priority_name = PRIORITY_NAMES.get(priority, 'default')
+        while True:
+            queued = time.perf_counter()
+            await self._acquire(chat_id, priority)
+            started = time.perf_counter()
+            TELEGRAM_QUEUE_WAIT.observe(started - queued, priority=priority_name)
+            try:
+                result = await callback(*args, **kwargs)
+                self.sent += 1
+                return result
+            except Exception as e:
+                TELEGRAM_ERRORS.inc(method=endpoint, error=type(e).__name__)
+                if not isinstance(e, RetryAfter):
+                    raise
+                self.retry_after_hits += 1
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+                # Flood control bot uchun umumiy - hamma yuborishni to'xtatamiz
+                loop = asyncio.get_running_loop()
+                self._paused_until = max(self._paused_until, loop.time() + e.retry_after)
+                logger.warning(f"⚠️ Telegram flood control: {e.retry_after}s kutamiz ({endpoint}, chat_id={chat_id})")
+            finally:
+                TELEGRAM_LATENCY.observe(time.perf_counter() - started, method=endpoint)
+
+    def stats(self) -> dict:
+        """Rejalashtiruvchi metrikalari"""
+        return {
+            'queued': {
+                'otp': len(self._lanes[PRIORITY_OTP]),
+                'admin': len(self._lanes[PRIORITY_ADMIN]),
+                'default': len(self._lanes[PRIORITY_DEFAULT]),
+            },
+            'sent': self.sent,
+            'throttled': self.throttled,
+            'retry_after_hits': self.retry_after_hits,
+            'chats_tracked': len(self._chats),
+        }
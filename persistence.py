@@ -0,0 +1,189 @@
+import asyncio
+import json
+import logging
+
+from telegram.ext import BasePersistence, PersistenceInput
+
+from storage import ThreadLocalConnections
+
+logger = logging.getLogger(__name__)
+
+# Jadvallar (conversations, user_data) migrations.py da yaratiladi
+SELECT_CONVERSATIONS_SQL = 'SELECT key, state FROM conversations WHERE name = ?'
+UPSERT_CONVERSATION_SQL = '''
+    INSERT INTO conversations (name, key, state, updated_at) VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+    ON CONFLICT(name, key) DO UPDATE SET state = excluded.state, updated_at = excluded.updated_at
+'''
+DELETE_CONVERSATION_SQL = 'DELETE FROM conversations WHERE name = ? AND key = ?'
+
+SELECT_USER_DATA_SQL = 'SELECT user_id, data FROM user_data'
+UPSERT_USER_DATA_SQL = '''
+    INSERT INTO user_data (user_id, data, updated_at) VALUES (?, ?, CURRENT_TIMESTAMP)
+    ON CONFLICT(user_id) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at
+'''
+DELETE_USER_DATA_SQL = 'DELETE FROM user_data WHERE user_id = ?'
+
+# Diskka yozilmaydigan user_data kalitlari
+PRIVATE_USER_DATA_KEYS = frozenset({'password'})
+
+
+class SQLitePersistence(BasePersistence):
+    """ConversationHandler holatlari va context.user_data ni users.db da saqlash
+
+    Application har update_interval soniyada faqat o'zgargan yozuvlar uchun
+    update_* ni chaqiradi. Ular xotiradagi buferga yig'iladi va flush_delay dan
+    keyin bitta tranzaksiyada yoziladi (har update uchun alohida commit yo'q).
+    Bot to'xtaganda flush() qolganini yozadi, shuning uchun restart'dan keyin
+    foydalanuvchilar qaysi qadamda bo'lsa, o'sha yerdan davom etadi.
+    Yozish/o'qish UserRepository executor'larida bajariladi.
+    """
+
+    def __init__(self, db_file: str, repository, update_interval: float = 5, flush_delay: float = 0.5):
+        super().__init__(
+            store_data=PersistenceInput(bot_data=False, chat_data=False, user_data=True, callback_data=False),
+            update_interval=update_interval
+        )
+        self.repository = repository
+        self.flush_delay = flush_delay
+        self._connections = ThreadLocalConnections(db_file)
+        self._conversations = {}  # {(name, key): state | None}
+        self._user_data = {}  # {user_id: json | None}
+        self._flush_handle = None
+        self._flush_task = None
+        self.flushes = 0
+        self.rows_written = 0
+
+    # --- Yuklash (bot ishga tushganda bir marta) ---
+
+    def _load_conversations(self, name):
+        rows = self._connections.get().execute(SELECT_CONVERSATIONS_SQL, (name,)).fetchall()
+        return {tuple(json.loads(key)): json.loads(state) for key, state in rows}
+
+    def _load_user_data(self):
+        rows = self._connections.get().execute(SELECT_USER_DATA_SQL).fetchall()
+        return {user_id: json.loads(data) for user_id, data in rows}
+
+    async def get_conversations(self, name):
+        conversations = await self.repository.run_read(self._load_conversations, name)
+        logger.info(f"💾 {name}: {len(conversations)} ta suhbat holati tiklandi")
+        return conversations
+
+    async def get_user_data(self):
+        return await self.repository.run_read(self._load_user_data)
+
+    async def get_chat_data(self):
+        return {}
+
+    async def get_bot_data(self):
+        return {}
+
+    async def get_callback_data(self):
+        return None
+
+    # --- O'zgarishlar (buferga yoziladi) ---
+
+    async def update_conversation(self, name, key, new_state):
+        self._conversations[(name, json.dumps(list(key)))] = new_state
+        self._schedule_flush()
+
+    async def update_user_data(self, user_id, data):
+        data = {key: value for key, value in data.items() if key not in PRIVATE_USER_DATA_KEYS}
+        self._user_data[user_id] = json.dumps(data, ensure_ascii=False)
+        self._schedule_flush()
+
+    async def drop_user_data(self, user_id):
+        self._user_data[user_id] = None
+        self._schedule_flush()
+
+    async def update_chat_data(self, chat_id, data):
+        pass
+
+    async def update_bot_data(self, data):
+        pass
+
+    async def update_callback_data(self, data):
+        pass
+
+    async def drop_chat_data(self, chat_id):
+        pass
+
+    async def refresh_user_data(self, user_id, user_data):
+        pass
+
+    async def refresh_chat_data(self, chat_id, chat_data):
+        pass
+
+    async def refresh_bot_data(self, bot_data):
+        pass
+
+    # --- Yozish ---
+
+    def _schedule_flush(self):
+        if self._flush_handle is None:
+            loop = asyncio.get_running_loop()
+            self._flush_handle = loop.call_later(self.flush_delay, self._start_flush)
+
+    def _start_flush(self):
+        self._flush_handle = None
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._write_pending(), name="persistence-flush")
+        else:
+            # Oldingi yozish hali tugamagan - keyingisini rejalashtiramiz
+            self._schedule_flush()
+
+    async def _write_pending(self):
+        conversations, self._conversations = self._conversations, {}
+        user_data, self._user_data = self._user_data, {}
+        if not conversations and not user_data:
+            return
+        try:
+            await self.repository.run_write(self._write_batch, conversations, user_data)
+        except Exception as e:
+            # Yozilmagan o'zgarishlarni qaytaramiz (yangilari ustun)
+            logger.exception(f"❌ Persistence yozishda xatolik: {e}")
+            self._conversations = {**conversations, **self._conversations}
+            self._user_data = {**user_data, **self._user_data}
+            self._schedule_flush()
+
+    def _write_batch(self, conversations, user_data):
+        """Barcha o'zgarishlarni bitta tranzaksiyada yozish (writer thread'da)"""
+        conn = self._connections.get()
+        with conn:
+            for (name, key), state in conversations.items():
+                if state is None:
+                    conn.execute(DELETE_CONVERSATION_SQL, (name, key))
+                else:
+                    conn.execute(UPSERT_CONVERSATION_SQL, (name, key, json.dumps(state)))
+            for user_id, data in user_data.items():
+                if data is None:
+                    conn.execute(DELETE_USER_DATA_SQL, (user_id,))
+                else:
+                    conn.execute(UPSERT_USER_DATA_SQL, (user_id, data))
+        self.flushes += 1
+        self.rows_written += len(conversations) + len(user_data)
+
+    async def flush(self):
+        """Buferdagi hamma narsani darhol yozish (bot to'xtaganda chaqiriladi)"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._flush_task is not None:
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+            self._flush_task = None
+        await self._write_pending()
+        if self._flush_handle is not None:
+            # Xatolik tufayli qayta rejalashtirilgan - to'xtash paytida kutmaymiz
+            self._flush_handle.cancel()
+            self._flush_handle = None
+            logger.error(f"❌ {len(self._conversations) + len(self._user_data)} ta o'zgarish yozilmay qoldi")
+
+    def stats(self) -> dict:
+        """Persistence metrikalari"""
+        return {
+            'pending': len(self._conversations) + len(self._user_data),
+            'flushes': self.flushes,
+            'rows_written': self.rows_written,
+        }
+
+    def close(self):
+        self._connections.close_all()
@@ -0,0 +1,103 @@
+import logging
+from types import MappingProxyType
+
+from i18n import DEFAULT_LANG, available_languages, get_text, language_name, on_reload
+
+logger = logging.getLogger(__name__)
+
+# Menyular
+MENU_LANG = 'lang'
+MENU_MAIN_CHOICE = 'main_choice'
+MENU_CODE = 'code_menu'
+MENU_MAIN = 'main_menu'
+MENU_BACK = 'back'
+
+# Har bir menyudagi tugmalar: {menyu: {tarjima kaliti: action}}
+MENU_BUTTONS = {
+    MENU_MAIN_CHOICE: {
+        'login': 'request_code',
+        'get_code': 'request_code',
+    },
+    MENU_CODE: {
+        'back': 'back',
+        'get_code_login': 'login',
+        'get_code_register': 'register',
+        'get_code_forgot': 'forgot',
+    },
+    MENU_MAIN: {
+        'profile': 'profile',
+        'change_phone': 'change_phone',
+        'contact_admin': 'contact_admin',
+        'forgot_password': 'forgot_password',
+        'settings': 'settings',
+        'logout': 'logout',
+    },
+    MENU_BACK: {
+        'back': 'back',
+    },
+}
+
+
+def normalize_button_text(text: str) -> str:
+    """Tugma matnini solishtirish uchun normalize qilish (bo'sh joylar va registr)"""
+    if not text:
+        return ""
+    return ' '.join(text.split()).casefold()
+
+
+def _add(table, menu, text, action):
+    key = normalize_button_text(text)
+    existing = table.get(key)
+    if existing is not None and existing != action:
+        logger.warning(f"⚠️ Tugma matni bir nechta action'ga mos: {menu}: {text!r} -> {existing}, {action}")
+        return
+    table[key] = action
+
+
+def build_routes(lang) -> MappingProxyType:
+    """Bitta til uchun tugma matni -> action jadvalini yaratish"""
+    routes = {}
+    for menu, buttons in MENU_BUTTONS.items():
+        table = {}
+        for key, action in buttons.items():
+            _add(table, menu, get_text(lang, key), action)
+        routes[menu] = table
+
+    # Til tugmalari: til tanlash klaviaturasidagi nomlar -> til kodi
+    table = {}
+    for code in available_languages():
+        _add(table, MENU_LANG, language_name(code), code)
+    routes[MENU_LANG] = table
+
+    # Asosiy menyuda (sozlamalar ichida) til tugmalari ham bosiladi
+    for text, code in table.items():
+        routes[MENU_MAIN].setdefault(text, f"lang:{code}")
+
+    return MappingProxyType({menu: MappingProxyType(table) for menu, table in routes.items()})
+
+
+# Har bir til uchun jadval birinchi ishlatilganda yaratiladi,
+# tarjimalar qayta yuklanganda tozalanadi
+_routes = {}  # {lang: {menyu: {matn: action}}}
+on_reload(_routes.clear)
+
+
+def _routes_for(lang):
+    routes = _routes.get(lang)
+    if routes is None:
+        routes = _routes[lang] = build_routes(lang)
+    return routes
+
+
+def route(menu: str, text: str, lang: str = DEFAULT_LANG):
+    """Tugma matni bo'yicha action ni topish (avval foydalanuvchi tili, keyin DEFAULT_LANG)"""
+    key = normalize_button_text(text)
+    action = _routes_for(lang)[menu].get(key)
+    if action is None and lang != DEFAULT_LANG:
+        action = _routes_for(DEFAULT_LANG)[menu].get(key)
+    return action
+
+
+def is_back(text: str, lang: str = DEFAULT_LANG) -> bool:
+    """"Orqaga" tugmasi bosilganmi"""
+    return route(MENU_BACK, text, lang) is not None
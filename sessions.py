@@ -0,0 +1,180 @@
+import logging
+import time
+from abc import ABC, abstractmethod
+
+from storage import ThreadLocalConnections
+from ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_phone_for_comparison(phone: str) -> str:
+    """Telefon raqamni normalize qilish (solishtirish uchun)"""
+    if not phone:
+        return ""
+    
+    # Faqat raqamlarni olish
+    digits = ''.join(filter(str.isdigit, phone))
+    
+    # Agar +998 bilan boshlanmasa, qo'shamiz
+    if digits.startswith('998'):
+        return '+998' + digits[3:]  # +998901234567
+    elif digits.startswith('8'):
+        return '+998' + digits[1:]  # +998901234567
+    else:
+        return '+998' + digits  # +998901234567
+
+
+class SessionStore(ABC):
+    """Telefon -> chat_id session'lari uchun umumiy interfeys (webhook uchun)
+
+    Kalit - normalize qilingan telefon raqam. Normalize yozish paytida bir marta
+    bajariladi, webhook esa bitta lookup bilan chat_id ni topadi. Yozuvlar OTP
+    muddati (ttl) tugagach eskiradi.
+    """
+
+    # True bo'lsa metodlar diskka murojaat qiladi - event loop'dan executor orqali chaqiriladi
+    # (resolve o'rniga lookup executor'da, record_lookup esa event loop'da)
+    blocking = False
+
+    @abstractmethod
+    def bind(self, phone: str, chat_id: int) -> str:
+        """Telefon raqamni chat_id ga bog'lash, normalize qilingan kalitni qaytaradi"""
+
+    @abstractmethod
+    def resolve(self, phone: str):
+        """Telefon raqam bo'yicha chat_id ni topish (topilmasa yoki eskirgan bo'lsa None)"""
+
+    def lookup(self, phone: str):
+        """resolve() ning metrikalarsiz qismi (blocking store'da executor thread'da chaqiriladi)"""
+        return self.resolve(phone)
+
+    def record_lookup(self, chat_id):
+        """lookup() natijasini metrikalarga qo'shish (event loop'da)"""
+
+    @abstractmethod
+    def sweep(self) -> int:
+        """Eskirgan session'larni tozalash, nechta o'chirilganini qaytaradi"""
+
+    @abstractmethod
+    def stats(self) -> dict:
+        """Session metrikalari"""
+
+    def close(self):
+        pass
+
+
+class InMemorySessionStore(SessionStore):
+    """Process ichidagi session'lar - LRU + TTL, maxsize dan oshmaydi"""
+
+    def __init__(self, ttl: float, maxsize: int):
+        self._chats = TTLCache(maxsize=maxsize, ttl=ttl)  # {normalized_phone: chat_id}
+
+    def bind(self, phone: str, chat_id: int) -> str:
+        key = normalize_phone_for_comparison(phone)
+        self._chats.set(key, chat_id)
+        return key
+
+    def resolve(self, phone: str):
+        return self._chats.get(normalize_phone_for_comparison(phone))
+
+    def sweep(self) -> int:
+        return self._chats.sweep()
+
+    def stats(self) -> dict:
+        return {'backend': 'memory', **self._chats.stats()}
+
+
+UPSERT_SESSION_SQL = '''
+    INSERT INTO sessions (normalized_phone, chat_id, expires_at) VALUES (?, ?, ?)
+    ON CONFLICT(normalized_phone) DO UPDATE SET chat_id = excluded.chat_id, expires_at = excluded.expires_at
+'''
+
+SELECT_SESSION_SQL = 'SELECT chat_id FROM sessions WHERE normalized_phone = ? AND expires_at > ?'
+
+DELETE_EXPIRED_SESSIONS_SQL = 'DELETE FROM sessions WHERE expires_at <= ?'
+
+# maxsize dan oshgan eng eski (eng tez eskiradigan) session'larni o'chirish
+DELETE_OVERFLOW_SESSIONS_SQL = '''
+    DELETE FROM sessions WHERE normalized_phone IN (
+        SELECT normalized_phone FROM sessions ORDER BY expires_at LIMIT ?
+    )
+'''
+
+
+class SQLiteSessionStore(SessionStore):
+    """users.db dagi sessions jadvali - restart'dan keyin ham saqlanadi va
+    shu faylni ishlatadigan barcha worker'lar uchun umumiy (jadval migrations.py da)"""
+
+    blocking = True
+
+    def __init__(self, db_file: str, ttl: float, maxsize: int):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._connections = ThreadLocalConnections(db_file)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def bind(self, phone: str, chat_id: int) -> str:
+        key = normalize_phone_for_comparison(phone)
+        conn = self._connections.get()
+        # expires_at - wall clock, chunki boshqa process'lar ham o'qiydi
+        conn.execute(UPSERT_SESSION_SQL, (key, chat_id, time.time() + self.ttl))
+        conn.commit()
+        return key
+
+    def resolve(self, phone: str):
+        chat_id = self.lookup(phone)
+        self.record_lookup(chat_id)
+        return chat_id
+
+    def lookup(self, phone: str):
+        key = normalize_phone_for_comparison(phone)
+        row = self._connections.get().execute(SELECT_SESSION_SQL, (key, time.time())).fetchone()
+        return row[0] if row else None
+
+    def record_lookup(self, chat_id):
+        # Hisoblagichlar faqat event loop'dan o'zgaradi (reader thread'lar parallel ishlaydi)
+        if chat_id is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+
+    def sweep(self) -> int:
+        conn = self._connections.get()
+        expired = conn.execute(DELETE_EXPIRED_SESSIONS_SQL, (time.time(),)).rowcount
+        overflow = self._count(conn) - self.maxsize
+        evicted = conn.execute(DELETE_OVERFLOW_SESSIONS_SQL, (overflow,)).rowcount if overflow > 0 else 0
+        conn.commit()
+        self.expirations += expired
+        self.evictions += evicted
+        return expired + evicted
+
+    def _count(self, conn) -> int:
+        return conn.execute('SELECT COUNT(*) FROM sessions').fetchone()[0]
+
+    def stats(self) -> dict:
+        return {
+            'backend': 'sqlite',
+            'size': self._count(self._connections.get()),
+            'maxsize': self.maxsize,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+        }
+
+    def close(self):
+        self._connections.close_all()
+
+
+def create_session_store(backend: str, db_file: str, ttl: float, maxsize: int) -> SessionStore:
+    """SESSION_BACKEND sozlamasi bo'yicha session store yaratish (memory | sqlite)"""
+    if backend == 'sqlite':
+        return SQLiteSessionStore(db_file, ttl=ttl, maxsize=maxsize)
+    if backend != 'memory':
+        logger.warning(f"⚠️ Noma'lum SESSION_BACKEND: {backend}, memory ishlatiladi")
+    return InMemorySessionStore(ttl=ttl, maxsize=maxsize)
@@ -0,0 +1,388 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from migrations import migrate
+from ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# SQLite sozlamalari (har bir ulanish ochilganda qo'llanadi)
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA mmap_size=67108864",   # 64 MB
+    "PRAGMA cache_size=-8000",     # ~8 MB
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",
+)
+
+# SQL matnlari o'zgarmas - sqlite3 ularni ulanish ichida kompilyatsiya qilingan
+# holda keshlaydi (prepared statement qayta ishlatiladi)
+SELECT_USER_SQL = '''
+    SELECT user_id, phone, full_name, role, balans, access_token, refresh_token, lang, logged_in
+    FROM users WHERE user_id = ?
+'''
+
+# UPSERT - mavjud qator o'chirilmaydi (created_at saqlanadi), faqat ustunlar yangilanadi
+SAVE_USER_SQL = '''
+    INSERT INTO users
+    (user_id, phone, full_name, role, balans, access_token, refresh_token, lang, logged_in, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+    ON CONFLICT(user_id) DO UPDATE SET
+        phone = excluded.phone,
+        full_name = excluded.full_name,
+        role = excluded.role,
+        balans = excluded.balans,
+        access_token = excluded.access_token,
+        refresh_token = excluded.refresh_token,
+        lang = excluded.lang,
+        logged_in = excluded.logged_in,
+        updated_at = excluded.updated_at
+'''
+
+# Qisman yangilash: faqat berilgan ustunlar (UPDATE users SET lang = ?, ... WHERE user_id = ?)
+UPDATE_USER_SQL = 'UPDATE users SET {columns}, updated_at = CURRENT_TIMESTAMP WHERE user_id = ?'
+
+
+def connect(db_file: str) -> sqlite3.Connection:
+    """Sozlangan SQLite ulanishini ochish"""
+    conn = sqlite3.connect(db_file, check_same_thread=False, cached_statements=64)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+# get_user qaytaradigan maydonlar (SELECT_USER_SQL dagi tartibda)
+USER_FIELDS = (
+    'user_id', 'phone', 'full_name', 'role', 'balans',
+    'access_token', 'refresh_token', 'lang', 'logged_in',
+)
+
+
+def row_to_user(row):
+    """Jadval qatorini user dict ga o'tkazish"""
+    if not row:
+        return None
+    return {
+        'user_id': row[0],
+        'phone': row[1],
+        'full_name': row[2],
+        'role': row[3],
+        'balans': row[4],
+        'access_token': row[5],
+        'refresh_token': row[6],
+        'lang': row[7],
+        'logged_in': bool(row[8])
+    }
+
+
+class ThreadLocalConnections:
+    """Har bir thread uchun bitta uzoq yashovchi SQLite ulanishi"""
+
+    def __init__(self, db_file: str):
+        self.db_file = db_file
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def get(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = connect(self.db_file)
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def close_all(self):
+        """Barcha ulanishlarni yopish"""
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+
+class UserStorage:
+    """users jadvali - har bir thread o'zining uzoq yashovchi ulanishidan foydalanadi"""
+
+    def __init__(self, db_file: str):
+        self.db_file = db_file
+        self._connections = ThreadLocalConnections(db_file)
+
+    def _get_conn(self) -> sqlite3.Connection:
+        return self._connections.get()
+
+    def init_db(self):
+        """Database sxemasini yaratish/yangilash (migrations.py)"""
+        migrate(self._get_conn())
+        logger.info("✅ Database initialized")
+
+    def get_user(self, user_id):
+        """Foydalanuvchini olish"""
+        row = self._get_conn().execute(SELECT_USER_SQL, (user_id,)).fetchone()
+        return row_to_user(row)
+
+    def save_user(self, user_data):
+        """Foydalanuvchini saqlash/yangilash"""
+        conn = self._get_conn()
+        conn.execute(SAVE_USER_SQL, (
+            user_data['user_id'],
+            user_data['phone'],
+            user_data['full_name'],
+            user_data['role'],
+            user_data['balans'],
+            user_data['access_token'],
+            user_data['refresh_token'],
+            user_data['lang'],
+            user_data['logged_in']
+        ))
+        conn.commit()
+
+    def update_user(self, user_id, columns):
+        """Faqat berilgan ustunlarni yangilash"""
+        self.write_batch({user_id: columns})
+
+    def write_batch(self, changes):
+        """Bir nechta foydalanuvchi o'zgarishlarini bitta tranzaksiyada yozish
+
+        changes - {user_id: {ustun: qiymat}}. Barcha ustunlar bo'lsa qator UPSERT
+        qilinadi, aks holda faqat berilgan ustunlar UPDATE qilinadi.
+        """
+        conn = self._get_conn()
+        with conn:
+            for user_id, columns in changes.items():
+                if all(field in columns for field in USER_FIELDS):
+                    conn.execute(SAVE_USER_SQL, tuple(columns[field] for field in USER_FIELDS))
+                    continue
+                names = [field for field in USER_FIELDS if field in columns and field != 'user_id']
+                if not names:
+                    continue
+                sql = UPDATE_USER_SQL.format(columns=', '.join(f"{name} = ?" for name in names))
+                conn.execute(sql, (*(columns[name] for name in names), user_id))
+
+    def close(self):
+        """Barcha ulanishlarni yopish"""
+        self._connections.close_all()
+
+
+# Yozuv bilan to'qnashgan keshsiz o'qish necha marta takrorlanadi
+READ_RETRIES = 3
+
+
+class UserRepository:
+    """users jadvali uchun asinxron API - event loop hech qachon SQLite'ni kutmaydi
+
+    Yozuvlar bitta writer thread'da ketma-ket bajariladi (SQLite bitta yozuvchini
+    qo'llaydi), o'qishlar esa alohida thread'larda WAL tufayli parallel ishlaydi.
+    get_user oldida LRU + TTL kesh turadi: save_user va set_* keshni ham
+    yangilaydi (write-through). set_* faqat kerakli ustunlarni UPDATE qiladi.
+
+    write_delay > 0 bo'lsa yozuvlar write-behind: o'zgarishlar user_id bo'yicha
+    birlashtiriladi va write_delay soniyadan keyin (yoki write_batch_size ta
+    foydalanuvchi yig'ilsa darhol) bitta tranzaksiyada yoziladi. Crash bo'lsa
+    oxirgi write_delay ichidagi o'zgarishlar yo'qolishi mumkin; write_delay=0 -
+    har bir yozuv commit bo'lgandan keyin qaytadi.
+    """
+
+    def __init__(self, storage: UserStorage, read_workers: int = 4,
+                 cache_size: int = 10000, cache_ttl: float = 300,
+                 write_delay: float = 0.0, write_batch_size: int = 100):
+        self.storage = storage
+        self.cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self.write_delay = write_delay
+        self.write_batch_size = write_batch_size
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='db-writer')
+        self._readers = ThreadPoolExecutor(max_workers=read_workers, thread_name_prefix='db-reader')
+        self._pending = {}  # {user_id: {ustun: qiymat}} - hali yozilmagan
+        self._inflight = {}  # hozir yozilayotgan paket
+        # Keshga tushmagan o'qish davom etayotgan foydalanuvchilar: {user_id: [o'qishlar soni, yozuv avlodi]}
+        self._reads = {}
+        self._flush_handle = None
+        self._flush_task = None
+        self.flushes = 0
+        self.rows_flushed = 0
+
+    async def run_read(self, func, *args):
+        """O'qish amalini reader thread'larda bajarish"""
+        return await asyncio.get_running_loop().run_in_executor(self._readers, func, *args)
+
+    async def run_write(self, func, *args):
+        """Yozish amalini yagona writer thread'da bajarish (users.db dagi boshqa jadvallar uchun ham)"""
+        return await asyncio.get_running_loop().run_in_executor(self._writer, func, *args)
+
+    async def get_user(self, user_id):
+        """Foydalanuvchini olish (avval keshdan)"""
+        user = self.cache.get(user_id)
+        if user is None:
+            user = await self._read_through(user_id)
+            if user is None:
+                return None
+        # Handler'lar natijani o'zgartirishi mumkin - keshdagi nusxa buzilmasin
+        return dict(user)
+
+    async def _read_through(self, user_id):
+        """DB dan o'qib keshga qo'yish - o'qish paytida yozuv bo'lsa eski qator keshga tushmaydi
+
+        Har bir o'qish oldidan va keyin foydalanuvchining yozuv avlodi solishtiriladi
+        (yozuv navbatga qo'yilganda va commit bo'lganda oshadi). Farq qilsa qator
+        qayta o'qiladi; READ_RETRIES dan keyin ham yozuv bo'lsa natija keshlanmaydi.
+        """
+        for _ in range(READ_RETRIES):
+            entry = self._reads.get(user_id)
+            if entry is None:
+                entry = self._reads[user_id] = [0, 0]
+            entry[0] += 1
+            generation = entry[1]
+            try:
+                user = await self.run_read(self.storage.get_user, user_id)
+            finally:
+                entry[0] -= 1
+                if not entry[0]:
+                    del self._reads[user_id]
+            user = self._overlay_unflushed(user_id, user)
+            if entry[1] == generation:
+                if user is not None:
+                    self.cache.set(user_id, user)
+                return user
+            # O'qish davomida yozildi - yozuvchi keshlagan nusxa bo'lsa u eng yangisi
+            cached = self.cache.get(user_id)
+            if cached is not None:
+                return cached
+        return user
+
+    def _overlay_unflushed(self, user_id, user):
+        """DB dan o'qilgan qatorga hali yozilmagan o'zgarishlarni qo'shish"""
+        for batch in (self._inflight, self._pending):
+            columns = batch.get(user_id)
+            if columns is None:
+                continue
+            if user is None:
+                if not all(field in columns for field in USER_FIELDS):
+                    continue
+                user = {}
+            user = {**user, **columns}
+        return user
+
+    def _bump_generation(self, user_ids):
+        """Shu foydalanuvchilarning davom etayotgan o'qishlari eskirgan deb belgilanadi"""
+        for user_id in user_ids:
+            entry = self._reads.get(user_id)
+            if entry is not None:
+                entry[1] += 1
+
+    async def _write(self, user_id, columns):
+        """O'zgarishni yozish (write-behind bo'lsa buferga)"""
+        self._bump_generation((user_id,))
+        if self.write_delay <= 0:
+            await self.run_write(self.storage.write_batch, {user_id: columns})
+            # Commit'dan oldin boshlangan o'qish eski qatorni ko'rgan bo'lishi mumkin
+            self._bump_generation((user_id,))
+            return
+        self._pending.setdefault(user_id, {}).update(columns)
+        if len(self._pending) >= self.write_batch_size:
+            self._start_flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.write_delay, self._start_flush)
+
+    def _start_flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_pending(), name="user-write-behind")
+        elif self._flush_handle is None:
+            # Oldingi paket hali yozilmoqda - keyingisini rejalashtiramiz
+            self._flush_handle = asyncio.get_running_loop().call_later(self.write_delay, self._start_flush)
+
+    async def _flush_pending(self):
+        if not self._pending:
+            return
+        self._inflight, self._pending = self._pending, {}
+        try:
+            await self.run_write(self.storage.write_batch, self._inflight)
+            # Commit paytida davom etgan o'qish uni ko'rmagan bo'lishi mumkin, overlay esa endi yo'q
+            self._bump_generation(self._inflight)
+            self.flushes += 1
+            self.rows_flushed += len(self._inflight)
+        except Exception as e:
+            # Yozilmagan o'zgarishlarni qaytaramiz (yangilari ustun)
+            logger.exception(f"❌ Foydalanuvchilarni yozishda xatolik: {e}")
+            for user_id, columns in self._inflight.items():
+                self._pending[user_id] = {**columns, **self._pending.get(user_id, {})}
+            if self._flush_handle is None:
+                self._flush_handle = asyncio.get_running_loop().call_later(self.write_delay, self._start_flush)
+        finally:
+            self._inflight = {}
+
+    async def flush(self):
+        """Buferdagi o'zgarishlarni darhol yozish (bot to'xtaganda)"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._flush_task is not None:
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+            self._flush_task = None
+        await self._flush_pending()
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+    async def save_user(self, user_data):
+        """Foydalanuvchini saqlash/yangilash"""
+        user = {key: user_data[key] for key in USER_FIELDS}
+        await self._write(user['user_id'], user)
+        self.cache.set(user['user_id'], user)
+
+    async def _update(self, user_id, columns):
+        """Bitta/bir nechta ustunni yangilash (keshdagi nusxa ham yangilanadi)"""
+        await self._write(user_id, columns)
+        user = self.cache.get(user_id)
+        if user is not None:
+            self.cache.set(user_id, {**user, **columns})
+
+    async def set_lang(self, user_id, lang):
+        """Foydalanuvchi tilini o'zgartirish"""
+        await self._update(user_id, {'lang': lang})
+
+    async def set_phone(self, user_id, phone):
+        """Telefon raqamni o'zgartirish"""
+        await self._update(user_id, {'phone': phone})
+
+    async def set_tokens(self, user_id, access_token, refresh_token):
+        """Access/refresh token'larni yangilash"""
+        await self._update(user_id, {'access_token': access_token, 'refresh_token': refresh_token})
+
+    async def set_logged_in(self, user_id, logged_in):
+        """Login holatini o'zgartirish"""
+        await self._update(user_id, {'logged_in': bool(logged_in)})
+
+    async def logout_user(self, user_id):
+        """Foydalanuvchini logout qilish"""
+        await self.set_logged_in(user_id, False)
+
+    def cache_stats(self) -> dict:
+        """Kesh metrikalari (hits, misses, size, ...)"""
+        return self.cache.stats()
+
+    def write_stats(self) -> dict:
+        """Write-behind metrikalari"""
+        return {
+            'write_delay': self.write_delay,
+            'pending': len(self._pending),
+            'flushes': self.flushes,
+            'rows_flushed': self.rows_flushed,
+        }
+
+    def close(self):
+        """Navbatdagi yozuvlarni tugatib, thread'lar va ulanishlarni yopish"""
+        if self._pending:
+            # flush() chaqirilmagan bo'lsa ham buferni yo'qotmaymiz
+            self._writer.submit(self.storage.write_batch, self._pending).result()
+            self._pending = {}
+        self._writer.shutdown(wait=True)
+        self._readers.shutdown(wait=True)
+        self.storage.close()
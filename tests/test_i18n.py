@@ -0,0 +1,24 @@
+import json
+
+import pytest
+
+import i18n
+from config import Settings
+
+
+@pytest.fixture
+def restore_catalog():
+    yield
+    i18n.configure_translations()
+
+
+def test_locales_dir_comes_from_settings(tmp_path, restore_catalog):
+    (tmp_path / 'uz.json').write_text(json.dumps({'uz': "O'zbekcha", 'welcome': 'Salom (test)'}), encoding='utf-8')
+    settings = Settings({'LOCALES_DIR': str(tmp_path)})
+    assert settings.locales_dir == str(tmp_path)
+
+    i18n.configure_translations(settings.locales_dir)
+    assert i18n.get_text('uz', 'welcome') == 'Salom (test)'
+
+    i18n.configure_translations(None)
+    assert i18n.get_text('uz', 'welcome') != 'Salom (test)'
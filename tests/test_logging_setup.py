@@ -0,0 +1,17 @@
+from logging_setup import redact
+
+
+def test_bot_token_in_api_url_is_redacted():
+    url = 'https://api.telegram.org/bot123456789:AAEhBOweik6ad9r_QXsLDvW-8Ip0zQr2abc/sendMessage'
+    assert redact(f"HTTP Request: POST {url}") == \
+        'HTTP Request: POST https://api.telegram.org/bot<redacted>/sendMessage'
+
+
+def test_phone_numbers_are_masked():
+    assert redact('phone=+998901234567') == 'phone=+99890*****67'
+    assert redact("{'phone': '998901234567'}") == "{'phone': '99890*****67'}"
+
+
+def test_hex_ids_are_not_mangled():
+    assert redact('trace_id=ab9981234567890cd') == 'trace_id=ab9981234567890cd'
+    assert redact('id 19981234567890') == 'id 19981234567890'
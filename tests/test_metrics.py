@@ -0,0 +1,22 @@
+import metrics
+
+
+def test_counter_metadata_uses_total_name():
+    registry = metrics.Registry()
+    counter = metrics.Counter('webhook_code_requests', "Webhook so'rovlari", ['status'], registry=registry)
+    counter.inc(status=202)
+    assert registry.render().splitlines() == [
+        "# HELP webhook_code_requests_total Webhook so'rovlari",
+        '# TYPE webhook_code_requests_total counter',
+        'webhook_code_requests_total{status="202"} 1',
+    ]
+
+
+def test_gauge_and_histogram_keep_their_names():
+    registry = metrics.Registry()
+    metrics.Gauge('queue_size', 'Navbat', registry=registry).set(3)
+    metrics.Histogram('latency_seconds', 'Kechikish', registry=registry, buckets=(1.0,)).observe(0.5)
+    lines = registry.render().splitlines()
+    assert '# TYPE queue_size gauge' in lines
+    assert '# TYPE latency_seconds histogram' in lines
+    assert 'latency_seconds_count 1' in lines
@@ -0,0 +1,74 @@
+import asyncio
+import json
+
+from telegram.ext import ExtBot
+from telegram.request import BaseRequest
+
+from outbound import PRIORITY_ADMIN, PRIORITY_DEFAULT, PRIORITY_OTP, OutboundScheduler
+
+BOT_USER = {'id': 1, 'is_bot': True, 'first_name': 'Test', 'username': 'test_bot'}
+
+
+class FakeRequest(BaseRequest):
+    """Tarmoqsiz Bot API: getMe va sendMessage ga muvaffaqiyatli javob"""
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    async def do_request(self, url, method, request_data=None, **kwargs):
+        if url.endswith('/getMe'):
+            result = BOT_USER
+        else:
+            params = request_data.parameters if request_data else {}
+            result = {'message_id': 1, 'date': 0, 'text': params.get('text'),
+                      'chat': {'id': int(params['chat_id']), 'type': 'private'}}
+        return 200, json.dumps({'ok': True, 'result': result}).encode()
+
+
+class RecordingScheduler(OutboundScheduler):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.priorities = []
+
+    async def process_request(self, callback, args, kwargs, endpoint, data, rate_limit_args):
+        self.priorities.append(rate_limit_args)
+        return await super().process_request(callback, args, kwargs, endpoint, data, rate_limit_args)
+
+
+def test_otp_priority_survives_extbot():
+    async def main():
+        scheduler = RecordingScheduler()
+        bot = ExtBot('123:abc', request=FakeRequest(), get_updates_request=FakeRequest(), rate_limiter=scheduler)
+        async with bot:
+            await bot.send_message(chat_id=42, text='kod', rate_limit_args=PRIORITY_OTP)
+            await bot.send_message(chat_id=-100, text='murojaat', rate_limit_args=PRIORITY_ADMIN)
+            await bot.send_message(chat_id=42, text='oddiy')
+        return scheduler.priorities
+
+    # getMe (initialize) ustuvorliksiz, keyin OTP, admin va oddiy xabar
+    assert asyncio.run(main())[-3:] == [PRIORITY_OTP, PRIORITY_ADMIN, None]
+
+
+def test_lanes_released_by_priority():
+    async def main():
+        scheduler = OutboundScheduler(global_rate=1000, private_rate=1000)
+        await scheduler.initialize()
+        order = []
+
+        async def send(name, priority):
+            async def callback():
+                order.append(name)
+            await scheduler.process_request(callback, (), {}, 'sendMessage', {'chat_id': 1}, priority)
+
+        try:
+            # Hammasi dispatcher uyg'onishidan oldin navbatga tushadi
+            await asyncio.gather(send('default', None), send('admin', PRIORITY_ADMIN),
+                                 send('otp', PRIORITY_OTP), send('default2', PRIORITY_DEFAULT))
+        finally:
+            await scheduler.shutdown()
+        return order
+
+    assert asyncio.run(main()) == ['otp', 'admin', 'default', 'default2']
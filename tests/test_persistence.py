@@ -0,0 +1,37 @@
+import asyncio
+
+from persistence import SQLitePersistence
+from storage import UserRepository, UserStorage
+
+
+def test_round_trip_excludes_password(tmp_path):
+    db_file = str(tmp_path / 'users.db')
+    storage = UserStorage(db_file)
+    storage.init_db()
+
+    async def save():
+        repo = UserRepository(storage)
+        persistence = SQLitePersistence(db_file, repo, flush_delay=60)
+        try:
+            await persistence.update_conversation('main_conversation', (42, 42), 3)
+            await persistence.update_conversation('main_conversation', (43, 43), 5)
+            await persistence.update_conversation('main_conversation', (43, 43), None)  # suhbat tugadi
+            await persistence.update_user_data(42, {'lang': 'ru', 'phone': '+998901234567', 'password': 'secret'})
+            await persistence.flush()  # bot to'xtaganda
+        finally:
+            persistence.close()
+            repo.close()
+
+    async def load():
+        repo = UserRepository(UserStorage(db_file))
+        persistence = SQLitePersistence(db_file, repo)
+        try:
+            return await persistence.get_conversations('main_conversation'), await persistence.get_user_data()
+        finally:
+            persistence.close()
+            repo.close()
+
+    asyncio.run(save())
+    conversations, user_data = asyncio.run(load())
+    assert conversations == {(42, 42): 3}
+    assert user_data == {42: {'lang': 'ru', 'phone': '+998901234567'}}
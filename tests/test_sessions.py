@@ -0,0 +1,41 @@
+import asyncio
+
+import pytest
+
+import bot
+from sessions import SessionStore, create_session_store
+from storage import UserRepository, UserStorage
+
+
+def test_incomplete_store_fails_on_creation():
+    class Incomplete(SessionStore):
+        def bind(self, phone, chat_id):
+            return phone
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+@pytest.mark.parametrize('backend', ['memory', 'sqlite'])
+def test_resolve_session_counts_hits_and_misses(tmp_path, monkeypatch, backend):
+    db_file = str(tmp_path / 'users.db')
+    storage = UserStorage(db_file)
+    storage.init_db()
+    repo = UserRepository(storage)
+    store = create_session_store(backend, db_file, ttl=60, maxsize=100)
+    monkeypatch.setattr(bot, 'user_repo', repo, raising=False)
+    monkeypatch.setattr(bot, 'user_sessions', store, raising=False)
+
+    async def main():
+        await bot.bind_session('+998 90 123 45 67', 42)
+        # Webhook formati (998...) ham o'sha session'ni topadi
+        return (await bot.resolve_session('998901234567'), await bot.resolve_session('+998900000000'),
+                await bot.session_stats())
+
+    try:
+        found, missing, stats = asyncio.run(main())
+    finally:
+        store.close()
+        repo.close()
+    assert (found, missing) == (42, None)
+    assert (stats['hits'], stats['misses']) == (1, 1)
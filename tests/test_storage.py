@@ -0,0 +1,120 @@
+import asyncio
+import threading
+
+import pytest
+
+from storage import UserRepository, UserStorage
+
+USER = {
+    'user_id': 1, 'phone': '+998901234567', 'full_name': 'Test User', 'role': 'user', 'balans': '0',
+    'access_token': 'a', 'refresh_token': 'r', 'lang': 'uz', 'logged_in': True,
+}
+
+
+class GatedStorage(UserStorage):
+    """Yozish va o'qishni testdan boshqariladigan darvozalar bilan to'xtatadi"""
+
+    def __init__(self, db_file):
+        super().__init__(db_file)
+        self.write_gate = threading.Event()
+        self.read_gate = threading.Event()
+        self.read_done = threading.Event()
+        self.write_gate.set()
+        self.read_gate.set()
+
+    def write_batch(self, changes):
+        self.write_gate.wait(5)
+        super().write_batch(changes)
+
+    def get_user(self, user_id):
+        user = super().get_user(user_id)
+        self.read_done.set()
+        self.read_gate.wait(5)
+        return user
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = GatedStorage(str(tmp_path / 'users.db'))
+    storage.init_db()
+    storage.save_user(USER)
+    return storage
+
+
+def test_read_during_sync_write_is_not_cached_stale(storage):
+    async def main():
+        repo = UserRepository(storage, write_delay=0)
+        try:
+            storage.write_gate.clear()
+            storage.read_gate.clear()
+            write = asyncio.create_task(repo.set_lang(1, 'ru'))
+            await asyncio.sleep(0.05)  # avlod oshdi, yozuv writer thread'da kutmoqda
+            read = asyncio.create_task(repo.get_user(1))
+            await asyncio.to_thread(storage.read_done.wait, 5)  # eski 'uz' qatori o'qildi
+            storage.write_gate.set()
+            await write  # commit bo'ldi, keshda hali hech narsa yo'q
+            storage.read_gate.set()
+            user = await read
+            return user['lang'], repo.cache.get(1)['lang'], storage.get_user(1)['lang']
+        finally:
+            repo.close()
+
+    assert asyncio.run(main()) == ('ru', 'ru', 'ru')
+
+
+def test_read_during_write_behind_flush_is_not_cached_stale(storage):
+    async def main():
+        repo = UserRepository(storage, write_delay=60)
+        try:
+            await repo.set_lang(1, 'ru')  # buferda
+            storage.read_gate.clear()
+            read = asyncio.create_task(repo.get_user(1))
+            await asyncio.to_thread(storage.read_done.wait, 5)
+            await repo.flush()  # commit va overlay o'qish tugashidan oldin
+            storage.read_gate.set()
+            user = await read
+            return user['lang'], repo.cache.get(1)['lang']
+        finally:
+            repo.close()
+
+    assert asyncio.run(main()) == ('ru', 'ru')
+
+
+def test_write_behind_batches_and_flushes_on_shutdown(storage):
+    async def main():
+        repo = UserRepository(storage, write_delay=60)
+        await repo.set_lang(1, 'ru')
+        await repo.set_phone(1, '+998907654321')
+        await repo.save_user({**USER, 'user_id': 2})
+        # Hali diskda yo'q, lekin get_user buferni ko'radi
+        assert storage.get_user(1)['lang'] == 'uz'
+        assert (await repo.get_user(1))['lang'] == 'ru'
+        await repo.flush()  # shutdown_clients dagidek
+        stats = repo.write_stats()
+        repo.close()
+        return stats
+
+    stats = asyncio.run(main())
+    assert stats['flushes'] == 1 and stats['rows_flushed'] == 2 and stats['pending'] == 0
+    reopened = UserStorage(storage.db_file)
+    try:
+        assert reopened.get_user(1)['lang'] == 'ru'
+        assert reopened.get_user(1)['phone'] == '+998907654321'
+        assert reopened.get_user(2) is not None
+    finally:
+        reopened.close()
+
+
+def test_close_writes_pending_without_flush(storage):
+    async def main():
+        repo = UserRepository(storage, write_delay=60)
+        await repo.set_lang(1, 'ru')
+        return repo
+
+    repo = asyncio.run(main())
+    repo.close()
+    reopened = UserStorage(storage.db_file)
+    try:
+        assert reopened.get_user(1)['lang'] == 'ru'
+    finally:
+        reopened.close()
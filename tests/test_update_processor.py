@@ -0,0 +1,40 @@
+import asyncio
+import time
+
+from telegram import Chat, Message, Update
+
+from update_processor import PerChatUpdateProcessor
+
+
+def make_update(update_id: int, chat_id: int) -> Update:
+    chat = Chat(chat_id, Chat.PRIVATE)
+    return Update(update_id, message=Message(update_id, date=None, chat=chat, text='x'))
+
+
+def test_busy_chat_does_not_block_other_chats():
+    async def main():
+        processor = PerChatUpdateProcessor(8)
+        running = {1: 0}
+        max_running = {1: 0}
+        finished = {}
+
+        async def handle(chat_id, delay):
+            running[chat_id] = running.get(chat_id, 0) + 1
+            max_running[chat_id] = max(max_running.get(chat_id, 0), running[chat_id])
+            await asyncio.sleep(delay)
+            running[chat_id] -= 1
+            finished[chat_id] = time.perf_counter()
+
+        started = time.perf_counter()
+        # Bitta chat'dan limitdan ko'p sekin update, keyin boshqa chat'dan bitta
+        tasks = [asyncio.create_task(processor.process_update(make_update(i, 1), handle(1, 0.05)))
+                 for i in range(20)]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(processor.process_update(make_update(100, 2), handle(2, 0))))
+        await asyncio.gather(*tasks)
+        return finished[2] - started, max_running[1], processor.stats()
+
+    other_wait, busy_parallel, stats = asyncio.run(main())
+    assert other_wait < 0.2
+    assert busy_parallel == 1  # bitta chat ichida tartib saqlanadi
+    assert stats['active_chats'] == 0
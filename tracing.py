@@ -0,0 +1,180 @@
+import json
+import logging
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+
+import metrics
+from sessions import normalize_phone_for_comparison
+from ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Backend'ga yuboriladigan va webhook'da qaytishi kutiladigan sarlavha
+CORRELATION_HEADER = 'X-Correlation-ID'
+
+OTP_DELIVERY_SECONDS = metrics.Histogram(
+    'otp_delivery_seconds', "OTP yetkazish bosqichlari davomiyligi (total - send-code dan Telegram ack gacha)",
+    ['segment'], buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0))
+
+# OTP bosqichlari: (segment, boshlanish belgilari, tugash belgisi)
+#   requested   - bot send-code so'rovini yubordi
+#   backend_ack - backend send-code ga javob qaytardi
+#   webhook     - backend kodni /webhook/code ga yubordi
+#   sending     - OTP worker kodni Telegram'ga yubora boshladi
+#   delivered   - Telegram xabarni qabul qildi
+# Boshlanish - ro'yxatdagi, tugashdan oldin qo'yilgan birinchi belgi. Webhook
+# ko'pincha send-code javobidan (backend_ack) oldin keladi - unda backend
+# bosqichi send-code boshlanishidan (requested) o'lchanadi.
+OTP_SEGMENTS = (
+    ('backend_request', ('requested',), 'backend_ack'),        # bot -> backend HTTP
+    ('backend', ('backend_ack', 'requested'), 'webhook'),      # backend ichida (kod yaratish, webhook chaqirish)
+    ('bot_queue', ('webhook',), 'sending'),                    # bot ichida (OTP navbati)
+    ('telegram', ('sending',), 'delivered'),                   # Telegram (rate limiter va qayta urinishlar bilan)
+    ('total', ('requested',), 'delivered'),
+)
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def new_trace_id() -> str:
+    return uuid.uuid4().hex
+
+
+def percentile(sorted_values, p: float):
+    """Nearest-rank percentil (sorted_values o'sish tartibida)"""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * p // 100))
+    return sorted_values[int(rank) - 1]
+
+
+class Tracer:
+    """Span'larni saqlash: xotiradagi ring buffer va ixtiyoriy JSONL fayl"""
+
+    def __init__(self, capacity: int = 1000, export_path: str = None):
+        self._spans = deque(maxlen=capacity)
+        self._file = open(export_path, 'a', encoding='utf-8', buffering=1) if export_path else None
+
+    def record(self, name: str, trace_id: str, start: float, duration: float, **attrs):
+        """Tugagan span'ni yozish (start - wall clock, duration - soniya)"""
+        span = {'trace_id': trace_id, 'name': name, 'start': start, 'duration': duration, **attrs}
+        self._spans.append(span)
+        if self._file is not None:
+            try:
+                self._file.write(json.dumps(span, ensure_ascii=False) + '\n')
+            except OSError as e:
+                logger.warning(f"⚠️ Span faylga yozilmadi: {e}")
+        return span
+
+    @contextmanager
+    def span(self, name: str, trace_id: str, **attrs):
+        """with bloki davomiyligini span sifatida yozish"""
+        start = time.time()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, trace_id, start, time.perf_counter() - started, **attrs)
+
+    def recent(self, limit: int = 100, trace_id: str = None) -> list:
+        """Oxirgi span'lar (trace_id bo'yicha filtrlash mumkin)"""
+        spans = [span for span in self._spans if trace_id is None or span['trace_id'] == trace_id]
+        return spans[-limit:]
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class OTPTracker:
+    """OTP yetkazishni send-code dan Telegram ack gacha kuzatish
+
+    send-code paytida trace_id yaratiladi va backend'ga X-Correlation-ID
+    sarlavhasida yuboriladi. Webhook trace_id ni sarlavha/body'da qaytarmasa,
+    u normalize qilingan telefon raqam bo'yicha topiladi. Yetkazilgan har bir
+    OTP uchun bosqichlar span sifatida yoziladi va percentillar hisoblanadi.
+    """
+
+    def __init__(self, tracer: Tracer, ttl: float = 300, maxsize: int = 100000, window: int = 1000):
+        self.tracer = tracer
+        self._traces = TTLCache(maxsize=maxsize, ttl=ttl)  # {trace_id: {belgi: (wall, monotonic)}}
+        self._by_phone = TTLCache(maxsize=maxsize, ttl=ttl)  # {normalized phone: trace_id}
+        self._completed = deque(maxlen=window)  # [{segment: soniya}]
+        self.untraced_webhooks = 0
+
+    def _mark(self, trace_id: str, mark: str, overwrite: bool = True):
+        trace = self._traces.get(trace_id)
+        if trace is None:
+            trace = {}
+            self._traces.set(trace_id, trace)
+        if overwrite or mark not in trace:
+            trace[mark] = (time.time(), time.perf_counter())
+
+    def start(self, phone: str) -> str:
+        """send-code yuborilishidan oldin - yangi trace_id"""
+        trace_id = new_trace_id()
+        self._mark(trace_id, 'requested')
+        self._by_phone.set(normalize_phone_for_comparison(phone), trace_id)
+        return trace_id
+
+    def backend_acked(self, trace_id: str):
+        """Backend send-code ga javob qaytardi"""
+        self._mark(trace_id, 'backend_ack')
+
+    def webhook_received(self, phone: str, trace_id: str = None) -> str:
+        """Webhook keldi - trace_id ni aniqlash (topilmasa yangisi, faqat bot ichidagi bosqichlar uchun)"""
+        by_phone = self._by_phone.pop(normalize_phone_for_comparison(phone))
+        if not trace_id:
+            trace_id = by_phone
+        if not trace_id:
+            self.untraced_webhooks += 1
+            trace_id = new_trace_id()
+        self._mark(trace_id, 'webhook')
+        return trace_id
+
+    def sending(self, trace_id: str):
+        """Telegram'ga yuborish boshlandi (qayta urinishlarda birinchisi saqlanadi)"""
+        if trace_id:
+            self._mark(trace_id, 'sending', overwrite=False)
+
+    def delivered(self, trace_id: str, **attrs):
+        """Telegram xabarni qabul qildi - bosqichlarni span sifatida yozish"""
+        if not trace_id:
+            return
+        self._mark(trace_id, 'delivered')
+        trace = self._traces.pop(trace_id, {})
+        segments = {}
+        for segment, begins, end in OTP_SEGMENTS:
+            if end not in trace:
+                continue
+            begin = next((mark for mark in begins if mark in trace and trace[mark][1] <= trace[end][1]), None)
+            if begin is not None:
+                duration = trace[end][1] - trace[begin][1]
+                segments[segment] = duration
+                OTP_DELIVERY_SECONDS.observe(duration, segment=segment)
+                self.tracer.record(f"otp.{segment}", trace_id, trace[begin][0], duration, **attrs)
+        if segments:
+            self._completed.append(segments)
+        if 'total' in segments:
+            logger.info("⏱ OTP yetkazildi: %.2fs (trace_id=%s)", segments['total'], trace_id)
+
+    def sweep(self) -> int:
+        """Yetkazilmagan (eskirgan) trace'larni tozalash"""
+        return self._traces.sweep() + self._by_phone.sweep()
+
+    def report(self) -> dict:
+        """Oxirgi yetkazilgan OTP'lar bo'yicha har bir bosqich percentillari (soniya)"""
+        report = {'count': len(self._completed), 'in_flight': len(self._traces),
+                  'untraced_webhooks': self.untraced_webhooks, 'segments': {}}
+        for segment, _, _ in OTP_SEGMENTS:
+            values = sorted(item[segment] for item in self._completed if segment in item)
+            if values:
+                report['segments'][segment] = {
+                    'count': len(values),
+                    **{f"p{p}": round(percentile(values, p), 4) for p in PERCENTILES},
+                    'max': round(values[-1], 4),
+                }
+        return report
@@ -0,0 +1,59 @@
+import asyncio
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+
+def _chat_key(update):
+    """Update qaysi suhbatga tegishli (chat, bo'lmasa user) - None bo'lsa cheklanmaydi"""
+    if isinstance(update, Update):
+        if update.effective_chat is not None:
+            return update.effective_chat.id
+        if update.effective_user is not None:
+            return update.effective_user.id
+    return None
+
+
+class PerChatUpdateProcessor(BaseUpdateProcessor):
+    """Turli chat'larning update'lari parallel, bitta chat'niki esa navbat bilan
+
+    Bir vaqtda ko'pi bilan max_concurrent_updates ta update ishlanadi, shuning uchun
+    bitta sekin backend so'rovi boshqa foydalanuvchilarni to'xtatmaydi. Bitta chat
+    ichida tartib saqlanadi - ConversationHandler holati va context.user_data
+    bir foydalanuvchining ketma-ket xabarlarida poyga (race) holatiga tushmaydi.
+    """
+
+    def __init__(self, max_concurrent_updates: int):
+        super().__init__(max_concurrent_updates)
+        self._locks = {}  # {chat_id: [asyncio.Lock, kutayotgan/ishlayotgan update'lar soni]}
+
+    async def process_update(self, update, coroutine):
+        # Chat navbati umumiy semaphore'dan oldin: band chat'ning kutayotgan
+        # update'lari boshqa chat'lar uchun slot egallamaydi
+        key = _chat_key(update)
+        if key is None:
+            await super().process_update(update, coroutine)
+            return
+        entry = self._locks.get(key)
+        if entry is None:
+            entry = self._locks[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                await super().process_update(update, coroutine)
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._locks[key]
+
+    async def do_process_update(self, update, coroutine):
+        await coroutine
+
+    def stats(self) -> dict:
+        return {'max_concurrent': self.max_concurrent_updates, 'active_chats': len(self._locks)}
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
@@ -0,0 +1,30 @@
+import logging
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+
+class WebhookServer:
+    """Bot bilan bitta event loop'da ishlaydigan asinxron HTTP server (aiohttp)"""
+
+    def __init__(self, host: str, port: int, routes: web.RouteTableDef):
+        self.host = host
+        self.port = port
+        self.app = web.Application()
+        self.app.add_routes(routes)
+        self._runner = None
+
+    async def start(self):
+        """Serverni joriy event loop'da ishga tushirish"""
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        logger.info(f"🌐 Webhook server: http://{self.host}:{self.port}")
+
+    async def stop(self):
+        """Serverni to'xtatish"""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None